@@ -7,15 +7,27 @@ output_file = "static/backdrop_images.json"
 
 # Get all image files with common extensions
 image_exts = ['.jpg', '.jpeg', '.png', '.webp']
-backdrop_files = []
 
-for file in os.listdir(backdrop_dir):
-    if any(file.lower().endswith(ext) for ext in image_exts):
-        # Store the path relative to static folder
-        backdrop_files.append(f"/letterboxd_backdrops/{file}")
+def generate_manifest(backdrop_dir=backdrop_dir, output_file=output_file):
+    """
+    Write the list of backdrop images the game picks its background from.
 
-# Save to JSON file
-with open(output_file, 'w') as f:
-    json.dump(backdrop_files, f)
+    Returns:
+        int: Number of backdrop images in the manifest
+    """
+    backdrop_files = []
 
-print(f"Generated JSON with {len(backdrop_files)} backdrop images")
\ No newline at end of file
+    for file in os.listdir(backdrop_dir):
+        if any(file.lower().endswith(ext) for ext in image_exts):
+            # Store the path relative to static folder
+            backdrop_files.append(f"/letterboxd_backdrops/{file}")
+
+    # Save to JSON file
+    with open(output_file, 'w') as f:
+        json.dump(backdrop_files, f)
+
+    return len(backdrop_files)
+
+if __name__ == "__main__":
+    count = generate_manifest()
+    print(f"Generated JSON with {count} backdrop images")
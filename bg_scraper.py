@@ -232,35 +232,20 @@ def save_backdrop_image(url, title, output_dir):
         print(f"  Error saving backdrop: {str(e)}")
         return None
 
-def main():
-    # Clear screen
-    os.system('cls' if os.name == 'nt' else 'clear')
-    
-    print("=== Letterboxd Backdrop Image Scraper ===\n")
+def scrape_backdrops(list_url, count, output_dir="letterboxd_backdrops"):
+    """
+    Download the backdrops of the first N films on a Letterboxd list and
+    write backdrop_summary.json next to them.
     
-    # Handle command line arguments
-    if len(sys.argv) >= 3:
-        list_url = sys.argv[1]
-        try:
-            count = int(sys.argv[2])
-        except ValueError:
-            count = 5
-            print(f"Invalid count. Using default: {count}")
-    else:
-        # Prompt for inputs if not provided as arguments
-        list_url = input("Enter Letterboxd list URL: ").strip()
+    Args:
+        list_url (str): URL of the Letterboxd list
+        count (int): Number of films to process
+        output_dir (str): Directory to save the backdrops and summary to
         
-        try:
-            count = int(input("How many films to process from the beginning of the list? "))
-            if count < 1:
-                count = 5
-                print(f"Invalid count. Using default: {count}")
-        except ValueError:
-            count = 5
-            print(f"Invalid count. Using default: {count}")
-    
+    Returns:
+        list: Summary entries (title, movie_url, backdrop_url, saved_path)
+    """
     # Create output directory
-    output_dir = "letterboxd_backdrops"
     os.makedirs(output_dir, exist_ok=True)
     
     print(f"\nGetting backdrop images for the first {count} films from:\n{list_url}\n")
@@ -271,8 +256,7 @@ def main():
     
     if not movie_links:
         print("No movies found. Check the list URL and try again.")
-        input("Press Enter to exit...")
-        return
+        return []
     
     # Step 2: Get backdrop images for each movie
     results = []
@@ -323,8 +307,48 @@ def main():
     print(f"\nImages saved to: {os.path.abspath(output_dir)}")
     print(f"Summary saved to: {summary_file}")
     
-    # Keep console open
-    input("\nPress Enter to exit...")
+    return results
+
+def main():
+    # Only prompt and keep the console open when someone is at the terminal,
+    # so the script also runs from cron and containers
+    interactive = sys.stdin.isatty()
+    
+    if interactive:
+        # Clear screen
+        os.system('cls' if os.name == 'nt' else 'clear')
+    
+    print("=== Letterboxd Backdrop Image Scraper ===\n")
+    
+    # Handle command line arguments
+    if len(sys.argv) >= 3:
+        list_url = sys.argv[1]
+        try:
+            count = int(sys.argv[2])
+        except ValueError:
+            count = 5
+            print(f"Invalid count. Using default: {count}")
+    elif interactive:
+        # Prompt for inputs if not provided as arguments
+        list_url = input("Enter Letterboxd list URL: ").strip()
+        
+        try:
+            count = int(input("How many films to process from the beginning of the list? "))
+            if count < 1:
+                count = 5
+                print(f"Invalid count. Using default: {count}")
+        except ValueError:
+            count = 5
+            print(f"Invalid count. Using default: {count}")
+    else:
+        print("Usage: python bg_scraper.py <list_url> <count>")
+        sys.exit(1)
+    
+    scrape_backdrops(list_url, count)
+    
+    if interactive:
+        # Keep console open
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,323 @@
+# build_graph_index.py
+import json
+import sys
+import os
+
+from compact_records import movie_key
+from build_search_index import normalize
+
+OUTPUT_FILE = os.path.join('static', 'graph_index.json')
+
+# Related films kept per film, most shared people first
+RELATED_LIMIT = 20
+
+# Sharing anyone in one of these roles makes two films an obvious pair
+OBVIOUS_ROLES = ('director', 'co-director', 'writer')
+
+# Two films sharing at least this many people are an obvious pair
+MIN_SHARED = 3
+
+ROLE_ACTOR = 'actor'
+ROLE_DIRECTOR = 'director'
+
+def legacy_slug(name):
+    """
+    Letterboxd-style person slug for films scraped before cast and crew were
+    stored with their slugs ("Frances McDormand" -> "frances-mcdormand").
+    """
+    return normalize(name).replace(' ', '-')
+
+def movie_credits(movie):
+    """
+    Everyone credited on a movie.
+
+    Uses the "cast" and "crew" lists when the movie has them and falls back to
+    the "actors" strings and "director" of older scrapes.
+
+    Args:
+        movie (dict): Movie dictionary as saved by the scraper
+
+    Returns:
+        list: [(slug, name, role), ...] in billing order
+    """
+    credits = []
+    if 'cast' in movie or 'crew' in movie:
+        for person in movie.get('cast') or []:
+            credits.append((person['slug'], person['name'], ROLE_ACTOR))
+        for person in movie.get('crew') or []:
+            credits.append((person['slug'], person['name'], person['role']))
+        return credits
+
+    for actor in movie.get('actors') or []:
+        name = actor.partition(' as ')[0].strip()
+        if name:
+            credits.append((legacy_slug(name), name, ROLE_ACTOR))
+    director = movie.get('director')
+    if director and director != 'Unknown':
+        credits.append((legacy_slug(director), director, ROLE_DIRECTOR))
+    return [credit for credit in credits if credit[0]]
+
+def _intern_id(ids, values, key, value=None):
+    if key not in ids:
+        ids[key] = len(values)
+        values.append(key if value is None else value)
+    return ids[key]
+
+def build_graph(movies, related_limit=RELATED_LIMIT):
+    """
+    Build the cast, crew and genre adjacency index.
+
+    Films, people, roles and genres are numbered in the order they are first
+    seen and every list refers to them by those ids:
+
+        films           [[key, title, year], ...]
+        people          [[slug, name], ...]
+        roles, genres   [name, ...]
+        film_credits    per film, flat [person id, role id, person id, role id, ...]
+        film_genres     per film, [genre id, ...]
+        person_films    per person, [film id, ...]
+        genre_films     per genre, [film id, ...]
+        related         per film, flat [film id, shared people, ...] most shared first
+
+    Args:
+        movies (list): Movie dictionaries, e.g. the entries of letterboxd_movies.json
+        related_limit (int): Related films kept per film
+
+    Returns:
+        dict: The index
+    """
+    films, film_ids = [], {}
+    people, person_ids = [], {}
+    roles, role_ids = [], {}
+    genres, genre_ids = [], {}
+    film_credits, film_genres = [], []
+    person_films, genre_films = [], []
+
+    for movie in movies:
+        title = movie.get('title')
+        if not title:
+            continue
+        year = str(movie.get('year') or '')
+        key = movie_key(title, year)
+        if key in film_ids:
+            continue
+        film_id = _intern_id(film_ids, films, key, [key, title, year])
+
+        credits = []
+        seen = set()
+        for slug, name, role in movie_credits(movie):
+            person_id = _intern_id(person_ids, people, slug, [slug, name])
+            role_id = _intern_id(role_ids, roles, role)
+            if (person_id, role_id) in seen:
+                continue
+            seen.add((person_id, role_id))
+            credits.extend((person_id, role_id))
+
+            if person_id == len(person_films):
+                person_films.append([])
+            if not person_films[person_id] or person_films[person_id][-1] != film_id:
+                person_films[person_id].append(film_id)
+        film_credits.append(credits)
+
+        genre_list = []
+        for genre in movie.get('genres') or []:
+            genre_id = _intern_id(genre_ids, genres, genre)
+            if genre_id == len(genre_films):
+                genre_films.append([])
+            if genre_id not in genre_list:
+                genre_list.append(genre_id)
+                genre_films[genre_id].append(film_id)
+        film_genres.append(genre_list)
+
+    related = []
+    for film_id, credits in enumerate(film_credits):
+        shared = {}
+        for person_id in set(credits[0::2]):
+            for other_id in person_films[person_id]:
+                if other_id != film_id:
+                    shared[other_id] = shared.get(other_id, 0) + 1
+        ranked = sorted(shared.items(), key=lambda item: (-item[1], item[0]))[:related_limit]
+        related.append([value for pair in ranked for value in pair])
+
+    return {
+        "version": 1,
+        "films": films,
+        "people": people,
+        "roles": roles,
+        "genres": genres,
+        "film_credits": film_credits,
+        "film_genres": film_genres,
+        "person_films": person_films,
+        "genre_films": genre_films,
+        "related": related
+    }
+
+class FilmGraph:
+    """
+    Queries over a graph index. Every lookup is a dictionary or list access;
+    related films are precomputed when the index is built.
+
+    Usage:
+        graph = FilmGraph.load('static/graph_index.json')
+        graph.related_films('Fargo_1996')
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.film_ids = {film[0]: film_id for film_id, film in enumerate(index['films'])}
+        self.person_ids = {person[0]: person_id for person_id, person in enumerate(index['people'])}
+        self.genre_ids = {genre: genre_id for genre_id, genre in enumerate(index['genres'])}
+
+    @classmethod
+    def load(cls, path=OUTPUT_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def film_key(self, film_id):
+        return self.index['films'][film_id][0]
+
+    def films_with_person(self, slug):
+        person_id = self.person_ids.get(slug)
+        if person_id is None:
+            return []
+        return [self.film_key(film_id) for film_id in self.index['person_films'][person_id]]
+
+    def films_with_genre(self, genre):
+        genre_id = self.genre_ids.get(genre)
+        if genre_id is None:
+            return []
+        return [self.film_key(film_id) for film_id in self.index['genre_films'][genre_id]]
+
+    def credits(self, key):
+        """
+        Returns:
+            list: [(slug, name, role), ...] for the film, empty if it is not indexed
+        """
+        film_id = self.film_ids.get(key)
+        if film_id is None:
+            return []
+        flat = self.index['film_credits'][film_id]
+        return [
+            tuple(self.index['people'][person_id]) + (self.index['roles'][role_id],)
+            for person_id, role_id in zip(flat[0::2], flat[1::2])
+        ]
+
+    def related_films(self, key, limit=RELATED_LIMIT):
+        """
+        Films sharing cast or crew with a film.
+
+        Returns:
+            list: [(key, shared people), ...] most shared first
+        """
+        film_id = self.film_ids.get(key)
+        if film_id is None:
+            return []
+        flat = self.index['related'][film_id][:limit * 2]
+        return [(self.film_key(other_id), shared) for other_id, shared in zip(flat[0::2], flat[1::2])]
+
+    def shared_people(self, key_a, key_b):
+        """
+        People credited on both films.
+
+        Returns:
+            list: [(slug, name, role in the first film, role in the second film), ...]
+        """
+        roles_b = {}
+        for slug, _, role in self.credits(key_b):
+            roles_b.setdefault(slug, role)
+        shared = []
+        seen = set()
+        for slug, name, role in self.credits(key_a):
+            if slug in roles_b and slug not in seen:
+                seen.add(slug)
+                shared.append((slug, name, role, roles_b[slug]))
+        return shared
+
+    def overlaps(self, keys=None, min_shared=MIN_SHARED, obvious_roles=OBVIOUS_ROLES):
+        """
+        Find pairs of films in a pool that are too easy to connect: they share
+        someone in an obvious role (the director, say) or at least min_shared
+        people overall.
+
+        Args:
+            keys (list): Movie keys of the pool, every indexed film if None
+            min_shared (int): Shared people that make a pair obvious
+            obvious_roles (tuple): Roles that make a pair obvious on their own
+
+        Returns:
+            list: [{"films": [key, key], "shared": [names], "obvious_roles": [roles]}, ...]
+                  most shared first
+        """
+        if keys is None:
+            pool = set(range(len(self.index['films'])))
+        else:
+            pool = {self.film_ids[key] for key in keys if key in self.film_ids}
+
+        pairs = set()
+        for film_id in pool:
+            for person_id in set(self.index['film_credits'][film_id][0::2]):
+                for other_id in self.index['person_films'][person_id]:
+                    if other_id > film_id and other_id in pool:
+                        pairs.add((film_id, other_id))
+
+        found = []
+        for film_a, film_b in pairs:
+            key_a, key_b = self.film_key(film_a), self.film_key(film_b)
+            shared = self.shared_people(key_a, key_b)
+            same_roles = {(slug, role) for slug, _, role in self.credits(key_a)} & \
+                         {(slug, role) for slug, _, role in self.credits(key_b)}
+            roles = sorted({role for _, role in same_roles if role in obvious_roles})
+            if roles or len(shared) >= min_shared:
+                found.append({
+                    "films": [key_a, key_b],
+                    "shared": [name for _, name, _, _ in shared],
+                    "obvious_roles": roles
+                })
+
+        found.sort(key=lambda overlap: (-len(overlap['obvious_roles']), -len(overlap['shared']), overlap['films']))
+        return found
+
+def build_graph_file(source_files, output_file=OUTPUT_FILE):
+    """
+    Build the graph index from one or more movie files and write it minified.
+
+    Returns:
+        dict: The index that was written
+    """
+    movies = []
+    for source_file in source_files:
+        with open(source_file, 'r', encoding='utf-8') as f:
+            movies.extend(json.load(f))
+
+    index = build_graph(movies)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Indexed {len(index['films'])} films, {len(index['people'])} people and {len(index['genres'])} genres")
+    print(f"Graph index saved to {output_file}")
+    return index
+
+def print_overlaps(graph, min_shared=MIN_SHARED, limit=50):
+    overlaps = graph.overlaps(min_shared=min_shared)
+    print(f"{len(overlaps)} obvious overlaps")
+    for overlap in overlaps[:limit]:
+        roles = f" [{', '.join(overlap['obvious_roles'])}]" if overlap['obvious_roles'] else ""
+        print(f"  {overlap['films'][0]} / {overlap['films'][1]}{roles}: {', '.join(overlap['shared'])}")
+    return overlaps
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    check = '--check' in args
+    if check:
+        args.remove('--check')
+
+    source_files = args or [os.path.join('static', 'letterboxd_movies.json')]
+    for source_file in source_files:
+        if not os.path.exists(source_file):
+            print(f"Movies file not found: {source_file}")
+            sys.exit(1)
+
+    index = build_graph_file(source_files)
+
+    if check:
+        print_overlaps(FilmGraph(index))
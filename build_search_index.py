@@ -0,0 +1,313 @@
+# build_search_index.py
+import json
+import sys
+import os
+import re
+import unicodedata
+
+from compact_records import movie_key
+
+OUTPUT_FILE = os.path.join('static', 'search_index.json')
+
+# Token prefixes up to this length are indexed; longer prefixes are checked
+# against the candidates those return
+PREFIX_LENGTH = 3
+
+# Dice similarity of bigrams a title needs to count as a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+# Bumped when the layout changes, titleSearch.ts checks it (INDEX_VERSION)
+INDEX_VERSION = 2
+
+# Misspellings that must find their title when it is in the index
+SEARCH_CHECKS = [
+    ("alein", "Alien"),
+    ("ternimator", "The Terminator"),
+    ("alien 3", "Alien³"),
+    ("top secret", "Top Secret!"),
+    ("reanimator", "Re-Animator"),
+]
+
+ARTICLES = ('the ', 'a ', 'an ')
+
+def normalize(text):
+    """
+    Normalise text for matching: accents, apostrophes and punctuation are
+    stripped and "&" becomes "and" ("Léon: The Professional" -> "leon the
+    professional", "Top_Secret_" -> "top secret").
+
+    src/lib/utils/titleSearch.ts must normalise queries the same way.
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace('&', ' and ')
+    text = re.sub(r"['’]", '', text)
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+def title_alternates(title, year):
+    """
+    Normalised forms a player might type for a title.
+
+    Args:
+        title (str): Movie title
+        year (str): Release year
+
+    Returns:
+        list: Unique alternates, the plain normalised title first
+    """
+    base = normalize(title)
+    alternates = [base]
+
+    for article in ARTICLES:
+        if base.startswith(article):
+            alternates.append(base[len(article):])
+
+    # "Alien³: Special Edition" -> "alien3" / main title before a colon
+    main_title = re.split(r'[:–—]| - ', title)[0]
+    if main_title != title:
+        alternates.append(normalize(main_title))
+
+    alternates.append(base.replace(' ', ''))
+    if year and str(year).isdigit():
+        alternates.append(f"{base} {year}")
+
+    unique = []
+    for alternate in alternates:
+        if alternate and alternate not in unique:
+            unique.append(alternate)
+    return unique
+
+def bigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+def fuzzy_alternates(alternates):
+    """
+    The alternates used for fuzzy matching. The spaceless one ("bigtroublein
+    littlechina") is left out, it only shares random pairs with misspellings.
+    """
+    spaceless = alternates[0].replace(' ', '')
+    return [alternate for alternate in alternates if alternate == alternates[0] or alternate != spaceless]
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0
+
+def build_index(movies):
+    """
+    Build the autocomplete index over movie titles, years and directors.
+
+    Movies are merged by movie key. Rows with an "id" come from an export of
+    the movies table and their title is the one shown and guessed, since the
+    game checks guesses against the database title; titles from other
+    sources ("Top Secret!" for "Top_Secret_") are kept as alternates.
+
+    Args:
+        movies (list): Movie dictionaries with at least a title, such as the
+            entries of letterboxd_movies.json or an export of the movies table
+
+    Returns:
+        dict: {"entries": [[key, title, year, director, alternates], ...],
+               "prefixes": {prefix: [entry ids]}, "bigrams": {gram: [entry ids]}}
+    """
+    entries = []
+    entry_ids = {}
+    from_table = set()
+    prefixes = {}
+    grams = {}
+
+    for movie in movies:
+        title = movie.get('title')
+        if not title:
+            continue
+        year = str(movie.get('year') or '')
+        key = movie_key(title, year)
+        director = movie.get('director') or ''
+        if director == 'Unknown':
+            director = ''
+        alternates = title_alternates(title, year)
+
+        if key not in entry_ids:
+            entry_ids[key] = len(entries)
+            entries.append([key, title, year, director, alternates])
+        else:
+            entry = entries[entry_ids[key]]
+            if movie.get('id') is not None and key not in from_table:
+                # The database title leads, so its plain form stays alternates[0]
+                entry[1] = title
+                entry[3] = director or entry[3]
+                entry[4] = alternates + [alternate for alternate in entry[4] if alternate not in alternates]
+            else:
+                entry[3] = entry[3] or director
+                entry[4] += [alternate for alternate in alternates if alternate not in entry[4]]
+        if movie.get('id') is not None:
+            from_table.add(key)
+
+    for entry_id, (key, title, year, director, alternates) in enumerate(entries):
+        words = set()
+        for alternate in alternates + [normalize(director)]:
+            words.update(alternate.split())
+        for word in words:
+            for length in range(1, min(PREFIX_LENGTH, len(word)) + 1):
+                prefixes.setdefault(word[:length], set()).add(entry_id)
+
+        for alternate in fuzzy_alternates(alternates):
+            for gram in bigrams(alternate):
+                grams.setdefault(gram, set()).add(entry_id)
+
+    return {
+        "version": INDEX_VERSION,
+        "entries": entries,
+        "prefixes": {prefix: sorted(ids) for prefix, ids in sorted(prefixes.items())},
+        "bigrams": {gram: sorted(ids) for gram, ids in sorted(grams.items())}
+    }
+
+def search(index, query, limit=12):
+    """
+    Answer an autocomplete query from the index. This mirrors the search in
+    src/lib/utils/titleSearch.ts and is used to check the index from Python.
+
+    Returns:
+        list: [{"id", "title", "year", "director"}, ...] best match first
+    """
+    q = normalize(query)
+    if not q:
+        return []
+
+    entries = index['entries']
+    tokens = q.split()
+    spaceless = q.replace(' ', '')
+    scores = {}
+
+    # Every query token must be the start of a word in the title or director
+    candidates = None
+    for token in tokens:
+        ids = set(index['prefixes'].get(token[:PREFIX_LENGTH], []))
+        candidates = ids if candidates is None else candidates & ids
+    for entry_id in candidates or ():
+        _, _, _, director, alternates = entries[entry_id]
+        for alternate in alternates:
+            words = alternate.split()
+            if all(any(word.startswith(token) for word in words) for token in tokens):
+                score = 2
+                if alternate.startswith(q):
+                    score += 1
+                if alternate == q or alternate.replace(' ', '') == spaceless:
+                    score += 2
+                scores[entry_id] = max(scores.get(entry_id, 0), score)
+        if entry_id not in scores:
+            words = normalize(director).split()
+            if all(any(word.startswith(token) for word in words) for token in tokens):
+                scores[entry_id] = 1
+
+    # Misspellings: titles whose bigrams are similar enough to the query's.
+    # A title can only reach the threshold if it shares at least min_shared
+    # of the query's bigrams, which rules out most titles before scoring.
+    if len(q) >= 3:
+        query_grams = bigrams(q)
+        min_shared = FUZZY_THRESHOLD * len(query_grams) / (2 - FUZZY_THRESHOLD)
+        counts = {}
+        for gram in query_grams:
+            for entry_id in index['bigrams'].get(gram, []):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+        for entry_id, count in counts.items():
+            if count < min_shared:
+                continue
+            for alternate in fuzzy_alternates(entries[entry_id][4]):
+                if alternate.replace(' ', '') == spaceless:
+                    similarity = 5
+                else:
+                    similarity = dice(query_grams, bigrams(alternate))
+                if similarity >= FUZZY_THRESHOLD:
+                    scores[entry_id] = max(scores.get(entry_id, 0), similarity)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], entries[item[0]][1].lower()))
+    return [
+        {
+            "id": entries[entry_id][0],
+            "title": entries[entry_id][1],
+            "year": entries[entry_id][2],
+            "director": entries[entry_id][3]
+        }
+        for entry_id, _ in ranked[:limit]
+    ]
+
+def check_search(index):
+    """
+    Run the SEARCH_CHECKS misspellings whose title is in the index.
+
+    Returns:
+        list: [(query, expected title, top result title or None), ...] for the
+              checks that failed
+    """
+    titles = {entry[1] for entry in index['entries']}
+    failures = []
+    for query, expected in SEARCH_CHECKS:
+        if expected not in titles:
+            continue
+        matches = search(index, query, limit=1)
+        top = matches[0]['title'] if matches else None
+        if top != expected:
+            failures.append((query, expected, top))
+    return failures
+
+def build_index_file(source_files, output_file=OUTPUT_FILE):
+    """
+    Build the index from one or more movie files and write it minified.
+
+    The movies table export (a JSON list of {"id", "title", "year",
+    "director"} rows) should be one of the sources: the game only accepts the
+    database titles, and the API answers from the index alone once it exists.
+
+    Args:
+        source_files (list): Movie JSON files, e.g. the movies table export
+            plus the scrape
+        output_file (str): Where to write the index
+
+    Returns:
+        dict: The index that was written
+
+    Raises:
+        ValueError: If the sources contain no titles, nothing is written
+    """
+    movies = []
+    for source_file in source_files:
+        with open(source_file, 'r', encoding='utf-8') as f:
+            movies.extend(json.load(f))
+
+    index = build_index(movies)
+    if not index['entries']:
+        raise ValueError(f"No titles in {', '.join(source_files)}, pass the movies table export as a source")
+    if not any(movie.get('id') is not None for movie in movies):
+        print("Warning: no movies table export among the sources, titles are the scraped ones")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Indexed {len(index['entries'])} titles ({len(index['prefixes'])} prefixes, {len(index['bigrams'])} bigrams)")
+    print(f"Index saved to {output_file}")
+    for query, expected, top in check_search(index):
+        print(f"  Search check failed: '{query}' should find {expected}, found {top}")
+    return index
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    query = None
+    if '--query' in args:
+        position = args.index('--query')
+        query = args[position + 1]
+        del args[position:position + 2]
+
+    source_files = args or [os.path.join('static', 'letterboxd_movies.json')]
+    for source_file in source_files:
+        if not os.path.exists(source_file):
+            print(f"Movies file not found: {source_file}")
+            sys.exit(1)
+
+    try:
+        index = build_index_file(source_files)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+
+    if query:
+        for match in search(index, query):
+            print(f"  {match['title']} ({match['year']}) - {match['director']}")
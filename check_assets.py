@@ -0,0 +1,486 @@
+# check_assets.py
+"""
+Integrity check and repair of the scraped asset tree.
+
+Every poster, served poster copy and backdrop that letterboxd_movies.json,
+backdrop_summary.json or backdrop_images.json refers to, and every image file
+on disk, is verified in a thread pool: it exists, decodes, is referenced by
+something, and whether it changed since the hash recorded when it was last
+verified. Only missing files and files that don't decode count as broken; a
+changed hash is just reported, since every re-scrape overwrites files.
+
+The result is a repair plan (static/asset_repair_plan.json):
+
+    copy          posters that are fine in static/images or static/posters
+                  but missing or broken in the other one, and re-scraped
+                  posters to copy over the served one
+    fetch         posters and backdrops to download again, and why
+    path_fixes    backdrop_summary.json saved_paths to rewrite, missing ones
+                  for backdrops that are on disk and ones pointing outside
+                  letterboxd_backdrops
+    changed       files that differ from their recorded hash
+    no_backdrop   summary entries without a backdrop URL, Letterboxd had no
+                  backdrop for them (only fetched with retry_no_backdrop)
+    orphans       image files nothing refers to (reported, never deleted)
+    unrepairable  broken files there is no source URL for
+
+--repair carries out the plan, fetching only the listed items through the
+scraper functions, then regenerates backdrop_images.json and records the
+hashes of the repaired files.
+"""
+import json
+import sys
+import os
+import io
+import re
+import time
+import random
+import shutil
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from compact_records import get_movie_url
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+STATIC_DIR = 'static'
+
+# Asset locations, relative to the static directory
+IMAGES_DIR = 'images'                   # posters as saved by the scraper
+POSTERS_DIR = 'posters'                 # the copy the app serves at /posters/
+BACKDROP_DIR = 'letterboxd_backdrops'
+MOVIES_FILE = 'letterboxd_movies.json'
+SUMMARY_FILE = f"{BACKDROP_DIR}/backdrop_summary.json"
+MANIFEST_FILE = 'backdrop_images.json'
+HASH_FILE = 'asset_hashes.json'
+PLAN_FILE = 'asset_repair_plan.json'
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Threads reading and decoding files
+WORKERS = 16
+
+STATUS_OK = 'ok'
+STATUS_MISSING = 'missing'
+STATUS_CORRUPT = 'corrupt'
+STATUS_CHANGED = 'changed'      # decodes, but differs from the recorded hash
+
+# Fetch reason of summary entries Letterboxd had no backdrop for
+REASON_NO_BACKDROP = "no backdrop on Letterboxd"
+
+def poster_filename(title, year):
+    """File name download_movie_poster uses for a movie."""
+    safe_title = re.sub(r'[^\w\-]', '_', title)
+    return f"{safe_title}_{year}.jpg"
+
+def backdrop_filename(title):
+    """File name save_backdrop_image uses for a title."""
+    safe_title = re.sub(r'[^\w\-]', '_', title)
+    return f"{safe_title}_backdrop.jpg"
+
+def summary_filename(saved_path):
+    """
+    File name of a backdrop_summary.json saved_path. The paths were written
+    by whichever OS ran the scraper ("letterboxd_backdrops\\Sorcerer_backdrop.jpg").
+    """
+    if not saved_path:
+        return None
+    return saved_path.replace('\\', '/').rsplit('/', 1)[-1]
+
+def static_relpath(saved_path, static_dir=STATIC_DIR):
+    """
+    A backdrop_summary.json saved_path relative to the static directory, with
+    forward slashes. The scrapers store it relative to where they ran
+    ("static/letterboxd_backdrops/X.jpg", or with backslashes on Windows).
+    """
+    if not saved_path:
+        return None
+    path = saved_path.replace('\\', '/')
+    static_name = os.path.basename(os.path.abspath(static_dir))
+    if path.startswith(f"{static_name}/{BACKDROP_DIR}/"):
+        path = path[len(static_name) + 1:]
+    if path.startswith(BACKDROP_DIR + '/'):
+        return path
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(static_dir)).replace('\\', '/')
+    return path if relative.startswith('..') else relative
+
+def image_error(data):
+    """
+    Check that image bytes decode.
+
+    Uses Pillow when it is installed. Without it only the container is
+    checked, which still catches truncated downloads: a JPEG must end with its
+    EOI marker, a PNG with its IEND chunk and a WebP must be as long as its
+    RIFF header says.
+
+    Returns:
+        str: Why the image is broken, or None if it is fine
+    """
+    if not data:
+        return "empty file"
+
+    if Image is not None:
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+        except Exception as e:
+            return f"does not decode: {str(e)}"
+        return None
+
+    if data.startswith(b'\xff\xd8'):
+        if not data.rstrip(b'\x00\r\n ').endswith(b'\xff\xd9'):
+            return "truncated JPEG"
+    elif data.startswith(b'\x89PNG\r\n\x1a\n'):
+        if b'IEND' not in data[-12:]:
+            return "truncated PNG"
+    elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        if int.from_bytes(data[4:8], 'little') + 8 > len(data):
+            return "truncated WebP"
+    else:
+        return "not an image"
+    return None
+
+def verify_asset(static_dir, path, expected=None):
+    """
+    Verify one asset.
+
+    Args:
+        static_dir (str): The static directory
+        path (str): Asset path relative to static_dir, with forward slashes
+        expected (dict): {"sha256", "size"} recorded for the asset, if any
+
+    Returns:
+        dict: {"path", "status", "error", "sha256", "size"}
+    """
+    result = {"path": path, "status": STATUS_OK, "error": None, "sha256": None, "size": 0}
+    try:
+        with open(os.path.join(static_dir, path), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        result["status"] = STATUS_MISSING
+        return result
+    except OSError as e:
+        result["status"] = STATUS_CORRUPT
+        result["error"] = str(e)
+        return result
+
+    result["size"] = len(data)
+    result["sha256"] = hashlib.sha256(data).hexdigest()
+    error = image_error(data)
+    if error:
+        result["status"] = STATUS_CORRUPT
+        result["error"] = error
+    elif expected and expected.get("sha256") != result["sha256"]:
+        result["status"] = STATUS_CHANGED
+        result["error"] = "differs from the recorded hash"
+    return result
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def list_images(static_dir, directory):
+    full_dir = os.path.join(static_dir, directory)
+    if not os.path.isdir(full_dir):
+        return []
+    return [
+        f"{directory}/{name}" for name in sorted(os.listdir(full_dir))
+        if name.lower().endswith(IMAGE_EXTS)
+    ]
+
+def collect_references(static_dir=STATIC_DIR):
+    """
+    Read the data files and work out which assets they refer to.
+
+    Returns:
+        dict: {"posters": {file name: movie info}, "backdrops": [summary
+               entries with "path" and the saved_path as "static_path"
+               added], "manifest": set of paths,
+               "movie_count": int}
+    """
+    movies = load_json(os.path.join(static_dir, MOVIES_FILE), [])
+    summary = load_json(os.path.join(static_dir, SUMMARY_FILE), [])
+    manifest = load_json(os.path.join(static_dir, MANIFEST_FILE), [])
+
+    posters = {}
+    for movie in movies:
+        if not movie.get('title'):
+            continue
+        year = str(movie.get('year') or '')
+        posters[poster_filename(movie['title'], year)] = {
+            "title": movie['title'],
+            "year": year,
+            "movie_url": get_movie_url(movie)
+        }
+
+    backdrops = []
+    for entry in summary:
+        name = summary_filename(entry.get('saved_path')) or backdrop_filename(entry.get('title') or '')
+        backdrops.append(dict(entry, path=f"{BACKDROP_DIR}/{name}",
+                              static_path=static_relpath(entry.get('saved_path'), static_dir)))
+
+    return {
+        "posters": posters,
+        "backdrops": backdrops,
+        "manifest": {item.lstrip('/') for item in manifest},
+        "movie_count": len(movies)
+    }
+
+def verify_all(static_dir, paths, hashes, workers=WORKERS):
+    """
+    Verify assets in a thread pool.
+
+    Returns:
+        dict: {path: verify_asset result}
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda path: verify_asset(static_dir, path, hashes.get(path)), sorted(paths))
+        return {result["path"]: result for result in results}
+
+def build_plan(references, results, retry_no_backdrop=False):
+    """
+    Turn verification results into a repair plan (see the module docstring).
+
+    Args:
+        references (dict): collect_references output
+        results (dict): verify_all output
+        retry_no_backdrop (bool): Look up backdrops for summary entries that
+            never had one instead of only reporting them
+    """
+    plan = {"copy": [], "fetch": [], "path_fixes": [], "changed": [], "no_backdrop": [],
+            "orphans": [], "unrepairable": []}
+
+    def broken(path):
+        return results[path]["status"] in (STATUS_MISSING, STATUS_CORRUPT)
+
+    def reason(path):
+        result = results[path]
+        return result["error"] or result["status"]
+
+    # Posters: static/images and static/posters should hold the same files
+    names = set(references["posters"])
+    names.update(path.split('/', 1)[1] for path in results if path.startswith((IMAGES_DIR + '/', POSTERS_DIR + '/')))
+    for name in sorted(names):
+        pair = [f"{IMAGES_DIR}/{name}", f"{POSTERS_DIR}/{name}"]
+        good = [path for path in pair if not broken(path)]
+        bad = [path for path in pair if broken(path)]
+        movie = references["posters"].get(name)
+
+        if good and bad:
+            plan["copy"].append({"from": good[0], "to": bad[0], "reason": reason(bad[0])})
+        elif (results[pair[0]]["status"] == STATUS_CHANGED and results[pair[1]]["status"] == STATUS_OK
+              and results[pair[0]]["sha256"] != results[pair[1]]["sha256"]):
+            # Re-scraped since the last check; serve the new poster. Copies
+            # that differed before are left alone, they may be edited on purpose
+            plan["copy"].append({"from": pair[0], "to": pair[1], "reason": f"{pair[0]} was re-scraped"})
+        elif bad and movie and movie["movie_url"]:
+            plan["fetch"].append(dict(movie, kind="poster", paths=bad, reason=reason(bad[0])))
+        elif bad and any(results[path]["status"] != STATUS_MISSING for path in bad):
+            plan["unrepairable"].append({"paths": bad, "reason": "no movie URL to fetch the poster from"})
+
+        # Without a movies file every poster would look unreferenced
+        if references["movie_count"] and not movie:
+            plan["orphans"].extend(path for path in pair if results[path]["status"] != STATUS_MISSING)
+
+    # Backdrops
+    summary_paths = set()
+    for entry in references["backdrops"]:
+        path = entry["path"]
+        summary_paths.add(path)
+        expected_path = path if entry.get('saved_path') or not broken(path) else None
+        if entry.get('static_path') != expected_path:
+            plan["path_fixes"].append({"title": entry.get('title'), "from": entry.get('saved_path'), "to": expected_path})
+        if broken(path) and not entry.get('saved_path') and not entry.get('backdrop_url') and not retry_no_backdrop:
+            plan["no_backdrop"].append({"title": entry.get('title'), "movie_url": entry.get('movie_url')})
+        elif broken(path):
+            if entry.get('saved_path'):
+                fetch_reason = reason(path)
+            else:
+                fetch_reason = "never saved" if entry.get('backdrop_url') else REASON_NO_BACKDROP
+            plan["fetch"].append({
+                "kind": "backdrop",
+                "title": entry.get('title'),
+                "movie_url": entry.get('movie_url'),
+                "backdrop_url": entry.get('backdrop_url'),
+                "paths": [path],
+                "reason": fetch_reason
+            })
+
+    # Each scrape rewrites backdrop_summary.json with only the films it saw,
+    # so backdrops missing from it are reported but kept
+    on_disk = {path for path in results if path.startswith(BACKDROP_DIR + '/') and results[path]["status"] != STATUS_MISSING}
+    for path in sorted(on_disk - summary_paths):
+        plan["orphans"].append(path)
+        if broken(path):
+            plan["unrepairable"].append({"paths": [path], "reason": "not in backdrop_summary.json"})
+
+    plan["changed"] = sorted(path for path, result in results.items() if result["status"] == STATUS_CHANGED)
+
+    # backdrop_images.json should list exactly the backdrop files on disk
+    plan["manifest_stale"] = on_disk != references["manifest"]
+    return plan
+
+def check_assets(static_dir=STATIC_DIR, workers=WORKERS, retry_no_backdrop=False):
+    """
+    Verify the asset tree and write the repair plan. The hash of every file
+    that decodes is recorded for the next check.
+
+    Args:
+        static_dir (str): The static directory
+        workers (int): Verification threads
+        retry_no_backdrop (bool): Plan to look up backdrops for summary entries
+            that never had one
+
+    Returns:
+        dict: The repair plan, with "counts" of each status
+    """
+    start_time = time.time()
+    references = collect_references(static_dir)
+    hash_file = os.path.join(static_dir, HASH_FILE)
+    hashes = load_json(hash_file, {})
+
+    # Every poster is checked in both places
+    poster_names = set(references["posters"])
+    for directory in (IMAGES_DIR, POSTERS_DIR):
+        poster_names.update(path.split('/', 1)[1] for path in list_images(static_dir, directory))
+    paths = {f"{directory}/{name}" for name in poster_names for directory in (IMAGES_DIR, POSTERS_DIR)}
+    paths.update(entry["path"] for entry in references["backdrops"])
+    paths.update(references["manifest"])
+    paths.update(list_images(static_dir, BACKDROP_DIR))
+
+    results = verify_all(static_dir, paths, hashes, workers)
+
+    for result in results.values():
+        if result["status"] in (STATUS_OK, STATUS_CHANGED):
+            hashes[result["path"]] = {"sha256": result["sha256"], "size": result["size"]}
+    with open(hash_file, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+
+    counts = {}
+    for result in results.values():
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    plan = {
+        "checked_at": datetime.now().isoformat(timespec='seconds'),
+        "counts": counts,
+        **build_plan(references, results, retry_no_backdrop)
+    }
+
+    with open(os.path.join(static_dir, PLAN_FILE), 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+
+    duration = time.time() - start_time
+    print(f"Checked {len(results)} assets in {duration:.1f} seconds: " +
+          ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    print(f"  {len(plan['copy'])} to copy, {len(plan['fetch'])} to fetch, {len(plan['path_fixes'])} summary paths to fix")
+    print(f"  {len(plan['changed'])} changed since the last check, {len(plan['no_backdrop'])} films without a backdrop")
+    print(f"  {len(plan['orphans'])} orphaned files, {len(plan['unrepairable'])} unrepairable")
+    if plan["manifest_stale"]:
+        print(f"  {MANIFEST_FILE} is out of date")
+    print(f"Repair plan saved to {os.path.join(static_dir, PLAN_FILE)}")
+    return plan
+
+def repair(plan, static_dir=STATIC_DIR, workers=WORKERS):
+    """
+    Carry out a repair plan. Only the fetch items touch the network.
+
+    Backdrop lookups for films Letterboxd had no backdrop for are expected to
+    come back empty, so they are counted as no_backdrop rather than failed.
+
+    Returns:
+        dict: Counts of copied, fetched, failed and no_backdrop items
+    """
+    stats = {"copied": 0, "fetched": 0, "failed": 0, "no_backdrop": 0}
+    repaired = set()
+
+    for item in plan["copy"]:
+        shutil.copyfile(os.path.join(static_dir, item["from"]), os.path.join(static_dir, item["to"]))
+        repaired.add(item["to"])
+        stats["copied"] += 1
+        print(f"Copied {item['from']} to {item['to']}")
+
+    summary_file = os.path.join(static_dir, SUMMARY_FILE)
+    summary = load_json(summary_file, [])
+    saved_paths = {item["title"]: item["to"] for item in plan["path_fixes"]}
+    backdrop_urls = {}
+
+    fetches = plan["fetch"]
+    for i, item in enumerate(fetches):
+        print(f"\nFetching {item['kind']} {i+1}/{len(fetches)}: {item['title']} ({item['reason']})")
+        saved = None
+        try:
+            if item["kind"] == "poster":
+                from letterboxd_scraper import download_movie_poster
+                saved = download_movie_poster(item["movie_url"], item["title"], item["year"])
+            else:
+                from bg_scraper import get_backdrop_image, save_backdrop_image
+                backdrop_dir = os.path.join(static_dir, BACKDROP_DIR)
+                backdrop_url = item["backdrop_url"]
+                saved = save_backdrop_image(backdrop_url, item["title"], backdrop_dir) if backdrop_url else None
+                if not saved and item["movie_url"]:
+                    # The stored image URL may have expired, look it up again
+                    _, backdrop_url = get_backdrop_image(item["movie_url"])
+                    saved = save_backdrop_image(backdrop_url, item["title"], backdrop_dir)
+                if saved:
+                    backdrop_urls[item["title"]] = backdrop_url
+                    saved_paths[item["title"]] = f"{BACKDROP_DIR}/{os.path.basename(saved)}"
+        except Exception as e:
+            print(f"  Error fetching {item['kind']}: {str(e)}")
+
+        if saved:
+            for path in item["paths"]:
+                target = os.path.join(static_dir, path)
+                if os.path.abspath(target) != os.path.abspath(saved):
+                    shutil.copyfile(saved, target)
+                repaired.add(path)
+            stats["fetched"] += 1
+        elif item["reason"] == REASON_NO_BACKDROP:
+            stats["no_backdrop"] += 1
+        else:
+            stats["failed"] += 1
+
+        # Add delay to avoid rate limiting
+        if i < len(fetches) - 1:
+            time.sleep(2 + random.random() * 2)
+
+    if summary and (saved_paths or backdrop_urls):
+        for entry in summary:
+            title = entry.get('title')
+            if title in saved_paths:
+                entry['saved_path'] = saved_paths[title]
+            if title in backdrop_urls:
+                entry['backdrop_url'] = backdrop_urls[title]
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Updated {len(saved_paths)} paths in {SUMMARY_FILE}")
+
+    if plan["manifest_stale"] or any(path.startswith(BACKDROP_DIR + '/') for path in repaired):
+        from backdrops import generate_manifest
+        count = generate_manifest(os.path.join(static_dir, BACKDROP_DIR), os.path.join(static_dir, MANIFEST_FILE))
+        print(f"Regenerated {MANIFEST_FILE} with {count} backdrop images")
+
+    # Record the hashes of the new files
+    hash_file = os.path.join(static_dir, HASH_FILE)
+    hashes = load_json(hash_file, {})
+    for result in verify_all(static_dir, repaired, {}, workers).values():
+        if result["status"] == STATUS_OK:
+            hashes[result["path"]] = {"sha256": result["sha256"], "size": result["size"]}
+        else:
+            print(f"Still broken after repair: {result['path']} ({result['error'] or result['status']})")
+    with open(hash_file, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+
+    print(f"\nRepair finished: {stats['copied']} copied, {stats['fetched']} fetched, {stats['failed']} failed, "
+          f"{stats['no_backdrop']} still without a backdrop")
+    return stats
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    plan = check_assets(retry_no_backdrop='--retry-no-backdrop' in args)
+    if '--repair' in args:
+        repair(plan)
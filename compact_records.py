@@ -0,0 +1,389 @@
+# compact_records.py
+import json
+import sys
+import os
+import re
+import gc
+import time
+import tracemalloc
+
+# Every review URL starts with this, so only the part after it is kept
+LETTERBOXD = 'https://letterboxd.com'
+
+# Stored in Review.rating when the review has no star rating ("")
+NO_RATING = -1
+
+# Review.flags bits
+HAS_RATING = 1
+IS_LIKED = 2
+RATING_PACKED = 4   # rating was a string packed by pack_rating
+
+REVIEW_KEYS = ('text', 'rating', 'has_rating', 'is_liked', 'likes', 'url')
+MOVIE_KEYS = ('title', 'year', 'rating', 'genres', 'director', 'actors',
+              'cast', 'crew', 'poster_path', 'is_liked', 'url', 'reviews')
+
+# Keys of the people in Movie.cast and Movie.crew, stored as tuples in this order
+CAST_KEYS = ('name', 'slug', 'character')
+CREW_KEYS = ('name', 'slug', 'role')
+
+# Key orders seen so far, shared between records so each is stored once
+_key_orders = {}
+
+def _shared_keys(keys):
+    keys = tuple(keys)
+    return _key_orders.setdefault(keys, keys)
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _pack_people(people, keys):
+    """
+    Turn cast or crew dictionaries into tuples of interned strings. A person
+    with other keys is kept as a dictionary so nothing is lost.
+    """
+    if people is None:
+        return None
+    return tuple(
+        tuple(_intern(person[key]) for key in keys)
+        if isinstance(person, dict) and tuple(person) == keys else person
+        for person in people
+    )
+
+def _unpack_people(people, keys):
+    if people is None:
+        return None
+    return [dict(zip(keys, person)) if isinstance(person, tuple) else person for person in people]
+
+def movie_key(title, year):
+    """
+    Build the identifier used for a movie across the static data files.
+
+    It is built the way the game builds poster URLs in gameStore.ts
+    (Title_Year), with ASCII-only word characters like JavaScript's \w, so
+    the game can compute it too. "Léon" becomes "L_on_1994". The scraper's
+    own poster filenames keep non-ASCII letters and only match for ASCII
+    titles.
+
+    Args:
+        title (str): Movie title
+        year (str): Release year
+
+    Returns:
+        str: Key such as "Top_Secret__1984"
+    """
+    safe_title = re.sub(r'[^\w\-]', '_', title, flags=re.ASCII)
+    return f"{safe_title}_{year}"
+
+def get_movie_url(movie):
+    """
+    Work out the Letterboxd page of a scraped movie.
+
+    Older scrapes did not store the movie URL, so fall back to the film slug
+    that every review URL contains (https://letterboxd.com/<user>/film/<slug>/).
+
+    Args:
+        movie (dict): Movie entry from letterboxd_movies.json
+
+    Returns:
+        str: The movie URL, or None if it can't be determined
+    """
+    if movie.get('url'):
+        return movie['url']
+
+    for review in movie.get('reviews', []):
+        match = re.search(r'/film/([^/]+)/', review.get('url') or '')
+        if match:
+            return f"https://letterboxd.com/film/{match.group(1)}/"
+    return None
+
+def pack_rating(rating):
+    """
+    Convert a string review rating ("8", "" ...) to a small integer.
+
+    Anything else, including ratings that are already numbers, is returned
+    unchanged so the conversion stays lossless.
+    """
+    if not isinstance(rating, str):
+        return rating
+    if rating == "":
+        return NO_RATING
+    if rating.isdigit() and str(int(rating)) == rating:
+        return int(rating)
+    return rating
+
+def unpack_rating(rating, packed=True):
+    """
+    Reverse pack_rating. Pass packed=False for a rating that was stored as
+    it was (Review.flags without RATING_PACKED).
+    """
+    if not packed:
+        return rating
+    if rating == NO_RATING:
+        return ""
+    if isinstance(rating, int):
+        return str(rating)
+    return rating
+
+def split_review_url(url):
+    """
+    Split a review URL into the reviewer and the film part of the path.
+
+    https://letterboxd.com/furious_iz/film/a-boy-and-his-dog/2/ becomes
+    ("furious_iz", "film/a-boy-and-his-dog/2/"). Both halves repeat across
+    reviews, so they are interned. URLs that don't have this shape, and
+    missing (None) URLs, are kept whole with reviewer None.
+
+    Returns:
+        tuple: (reviewer, path)
+    """
+    if isinstance(url, str) and url.startswith(LETTERBOXD + '/'):
+        reviewer, _, path = url[len(LETTERBOXD) + 1:].partition('/')
+        if reviewer and path and join_review_url(reviewer, path) == url:
+            return sys.intern(reviewer), sys.intern(path)
+    return None, url
+
+def join_review_url(reviewer, path):
+    if reviewer is None:
+        return path
+    return f"{LETTERBOXD}/{reviewer}/{path}"
+
+class Review:
+    """
+    Slotted stand-in for a review dictionary.
+
+    String ratings are packed into small integers, has_rating, is_liked and
+    whether the rating was packed share one flags integer and the URL is
+    stored as an interned reviewer and film path.
+    """
+    __slots__ = ('text', 'rating', 'flags', 'likes', 'reviewer', 'path', 'keys', 'extra')
+
+    def __init__(self, text, rating, flags, likes, reviewer, path, keys=REVIEW_KEYS, extra=None):
+        self.text = text
+        self.rating = rating
+        self.flags = flags
+        self.likes = likes
+        self.reviewer = reviewer
+        self.path = path
+        self.keys = keys
+        self.extra = extra
+
+    @property
+    def has_rating(self):
+        return bool(self.flags & HAS_RATING)
+
+    @property
+    def is_liked(self):
+        return bool(self.flags & IS_LIKED)
+
+    @property
+    def url(self):
+        return join_review_url(self.reviewer, self.path)
+
+    @classmethod
+    def from_dict(cls, review):
+        flags = 0
+        if review.get('has_rating'):
+            flags |= HAS_RATING
+        if review.get('is_liked'):
+            flags |= IS_LIKED
+        rating = review.get('rating', '')
+        packed = pack_rating(rating)
+        if isinstance(rating, str) and isinstance(packed, int):
+            flags |= RATING_PACKED
+        reviewer, path = split_review_url(review.get('url', ''))
+        extra = {key: value for key, value in review.items() if key not in REVIEW_KEYS} or None
+        return cls(
+            review.get('text', ''),
+            packed,
+            flags,
+            review.get('likes', 0),
+            reviewer,
+            path,
+            _shared_keys(review.keys()),
+            extra
+        )
+
+    def to_dict(self):
+        values = {
+            'text': self.text,
+            'rating': unpack_rating(self.rating, bool(self.flags & RATING_PACKED)),
+            'has_rating': self.has_rating,
+            'is_liked': self.is_liked,
+            'likes': self.likes,
+            'url': self.url
+        }
+        if self.extra:
+            values.update(self.extra)
+        return {key: values[key] for key in self.keys}
+
+class Movie:
+    """
+    Slotted stand-in for a movie dictionary from letterboxd_movies.json.
+
+    Short strings that repeat across films (year, rating, genres, director,
+    actor names) are interned, cast and crew are tuples of interned
+    (name, slug, character) and (name, slug, role), and the reviews are
+    Review records.
+    """
+    __slots__ = ('title', 'year', 'rating', 'genres', 'director', 'actors', 'cast', 'crew',
+                 'poster_path', 'is_liked', 'url', 'reviews', 'keys', 'extra')
+
+    def __init__(self, title, year, rating, genres, director, actors, cast, crew,
+                 poster_path, is_liked, url, reviews, keys=MOVIE_KEYS, extra=None):
+        self.title = title
+        self.year = year
+        self.rating = rating
+        self.genres = genres
+        self.director = director
+        self.actors = actors
+        self.cast = cast
+        self.crew = crew
+        self.poster_path = poster_path
+        self.is_liked = is_liked
+        self.url = url
+        self.reviews = reviews
+        self.keys = keys
+        self.extra = extra
+
+    @property
+    def key(self):
+        return movie_key(self.title, self.year)
+
+    @classmethod
+    def from_dict(cls, movie):
+        extra = {key: value for key, value in movie.items() if key not in MOVIE_KEYS} or None
+        return cls(
+            movie.get('title'),
+            _intern(movie.get('year')),
+            _intern(movie.get('rating')),
+            tuple(_intern(genre) for genre in movie.get('genres', [])),
+            _intern(movie.get('director')),
+            tuple(_intern(actor) for actor in movie.get('actors', [])),
+            _pack_people(movie.get('cast'), CAST_KEYS),
+            _pack_people(movie.get('crew'), CREW_KEYS),
+            movie.get('poster_path'),
+            movie.get('is_liked', False),
+            movie.get('url'),
+            [Review.from_dict(review) for review in movie.get('reviews', [])],
+            _shared_keys(movie.keys()),
+            extra
+        )
+
+    def to_dict(self):
+        values = {
+            'title': self.title,
+            'year': self.year,
+            'rating': self.rating,
+            'genres': list(self.genres),
+            'director': self.director,
+            'actors': list(self.actors),
+            'cast': _unpack_people(self.cast, CAST_KEYS),
+            'crew': _unpack_people(self.crew, CREW_KEYS),
+            'poster_path': self.poster_path,
+            'is_liked': self.is_liked,
+            'url': self.url,
+            'reviews': [review.to_dict() for review in self.reviews]
+        }
+        if self.extra:
+            values.update(self.extra)
+        return {key: values[key] for key in self.keys}
+
+def load_movies(path):
+    """
+    Load letterboxd_movies.json as a list of Movie records.
+
+    Each movie is converted as soon as it's parsed so the full list of
+    dictionaries never has to be held alongside the compact copy.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_pairs_hook=_compact_hook)
+
+def _compact_hook(pairs):
+    obj = dict(pairs)
+    if 'reviews' in obj and 'title' in obj:
+        return Movie.from_dict(obj)
+    return obj
+
+def dump_movies(movies, f):
+    """
+    Write movies to an open file in exactly the layout json.dump(movies,
+    ensure_ascii=False, indent=2) produces, converting one record at a time.
+
+    Args:
+        movies (list): Movie records or movie dictionaries
+        f: File opened for writing text
+    """
+    if not movies:
+        f.write('[]')
+        return
+
+    f.write('[\n')
+    for i, movie in enumerate(movies):
+        if isinstance(movie, Movie):
+            movie = movie.to_dict()
+        text = json.dumps(movie, ensure_ascii=False, indent=2)
+        f.write('\n'.join('  ' + line for line in text.split('\n')))
+        f.write(',\n' if i < len(movies) - 1 else '\n')
+    f.write(']')
+
+def benchmark(path):
+    """
+    Compare the memory needed to hold a movies file as dictionaries and as
+    compact records, and check that the conversion round-trips.
+
+    Args:
+        path (str): Path to letterboxd_movies.json
+
+    Returns:
+        dict: Bytes used by each representation and load times
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        as_dicts = json.load(f)
+    dict_seconds = time.perf_counter() - start
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    review_count = sum(len(movie.get('reviews', [])) for movie in as_dicts)
+
+    round_trip = [Movie.from_dict(movie).to_dict() for movie in as_dicts] == as_dicts
+    del as_dicts
+    gc.collect()
+    tracemalloc.stop()
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    as_records = load_movies(path)
+    compact_seconds = time.perf_counter() - start
+    gc.collect()
+    compact_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        "movies": len(as_records),
+        "reviews": review_count,
+        "dict_bytes": dict_bytes,
+        "compact_bytes": compact_bytes,
+        "dict_seconds": dict_seconds,
+        "compact_seconds": compact_seconds,
+        "round_trip": round_trip
+    }
+
+if __name__ == "__main__":
+    movies_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join('static', 'letterboxd_movies.json')
+
+    if not os.path.exists(movies_file):
+        print(f"Movies file not found: {movies_file}")
+        sys.exit(1)
+
+    print(f"Benchmarking {movies_file}")
+    result = benchmark(movies_file)
+
+    print(f"Movies: {result['movies']}, reviews: {result['reviews']}")
+    print(f"Dictionaries:    {result['dict_bytes'] / 1024 / 1024:8.2f} MB  (loaded in {result['dict_seconds']:.2f}s)")
+    print(f"Compact records: {result['compact_bytes'] / 1024 / 1024:8.2f} MB  (loaded in {result['compact_seconds']:.2f}s)")
+    if result['movies']:
+        print(f"Saved {100 * (1 - result['compact_bytes'] / result['dict_bytes']):.1f}% of memory")
+    print(f"Lossless round trip: {result['round_trip']}")
@@ -0,0 +1,312 @@
+# export_columnar.py
+import sys
+import os
+import time
+
+from compact_records import Movie, load_movies, movie_key, pack_rating, split_review_url, NO_RATING
+
+# pyarrow is only needed for the columnar export, not for scraping
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+OUTPUT_DIR = os.path.join('static', 'columnar')
+
+# Movies buffered before a batch is written to every table
+BATCH_SIZE = 50
+
+FORMAT_ARROW = 'arrow'      # Arrow IPC files, uncompressed so they can be memory-mapped
+FORMAT_PARQUET = 'parquet'
+
+def _schemas():
+    return {
+        'movies': pa.schema([
+            ('movie_id', pa.int32()),
+            ('movie_key', pa.string()),
+            ('title', pa.string()),
+            ('year', pa.int16()),
+            ('rating', pa.float32()),
+            ('director', pa.string()),
+            ('is_liked', pa.bool_()),
+            ('poster_path', pa.string()),
+            ('url', pa.string()),
+            ('review_count', pa.int32())
+        ]),
+        'reviews': pa.schema([
+            ('movie_id', pa.int32()),
+            ('rating', pa.int8()),
+            ('has_rating', pa.bool_()),
+            ('is_liked', pa.bool_()),
+            ('likes', pa.int32()),
+            ('reviewer', pa.string()),
+            ('path', pa.string()),
+            ('text_length', pa.int32()),
+            ('text', pa.string())
+        ]),
+        'cast': pa.schema([
+            ('movie_id', pa.int32()),
+            ('billing', pa.int16()),
+            ('actor', pa.string()),
+            ('slug', pa.string()),
+            ('character', pa.string())
+        ]),
+        'genres': pa.schema([
+            ('movie_id', pa.int32()),
+            ('genre', pa.string())
+        ])
+    }
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class ColumnarWriter:
+    """
+    Stream movies into one columnar file per table (movies, reviews, cast,
+    genres), writing a batch every BATCH_SIZE movies.
+
+    Movies get sequential integer ids in the order they are added; the
+    movie_key column links them back to the JSON files.
+
+    Usage:
+        with ColumnarWriter('static/columnar') as writer:
+            for movie in movies:
+                writer.add_movie(movie)
+    """
+
+    def __init__(self, output_dir=OUTPUT_DIR, fmt=FORMAT_ARROW, batch_size=BATCH_SIZE):
+        if pa is None:
+            raise ImportError("pyarrow is required for the columnar export: pip install pyarrow")
+        if fmt not in (FORMAT_ARROW, FORMAT_PARQUET):
+            raise ValueError(f"Unknown columnar format: {fmt}")
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.schemas = _schemas()
+        self.next_id = 0
+        self.pending = 0
+        self.columns = {}
+        self.writers = {}
+        self.sinks = []
+        stale_fmt = FORMAT_ARROW if fmt == FORMAT_PARQUET else FORMAT_PARQUET
+        for table, schema in self.schemas.items():
+            self.columns[table] = {name: [] for name in schema.names}
+            # An older export in the other format would otherwise be read instead
+            stale_path = os.path.join(output_dir, f"{table}.{stale_fmt}")
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+            path = os.path.join(output_dir, f"{table}.{fmt}")
+            if fmt == FORMAT_PARQUET:
+                self.writers[table] = pq.ParquetWriter(path, schema)
+            else:
+                sink = pa.OSFile(path, 'wb')
+                self.sinks.append(sink)
+                self.writers[table] = pa.ipc.new_file(sink, schema)
+
+    def _append(self, table, **row):
+        columns = self.columns[table]
+        for name, value in row.items():
+            columns[name].append(value)
+
+    def add_movie(self, movie):
+        """
+        Add one movie and its reviews, cast and genres.
+
+        Args:
+            movie: Movie record or movie dictionary from letterboxd_movies.json
+
+        Returns:
+            int: The movie_id assigned to the movie
+        """
+        if isinstance(movie, Movie):
+            movie = movie.to_dict()
+
+        movie_id = self.next_id
+        self.next_id += 1
+        reviews = movie.get('reviews', [])
+
+        self._append(
+            'movies',
+            movie_id=movie_id,
+            movie_key=movie_key(movie.get('title', ''), movie.get('year', '')),
+            title=movie.get('title'),
+            year=_to_int(movie.get('year')),
+            rating=_to_float(movie.get('rating')),
+            director=movie.get('director'),
+            is_liked=movie.get('is_liked', False),
+            poster_path=movie.get('poster_path'),
+            url=movie.get('url'),
+            review_count=len(reviews)
+        )
+
+        for review in reviews:
+            rating = pack_rating(review.get('rating', ''))
+            reviewer, path = split_review_url(review.get('url', ''))
+            text = review.get('text', '')
+            self._append(
+                'reviews',
+                movie_id=movie_id,
+                rating=rating if isinstance(rating, int) and rating != NO_RATING else None,
+                has_rating=review.get('has_rating', False),
+                is_liked=review.get('is_liked', False),
+                likes=review.get('likes', 0),
+                reviewer=reviewer,
+                path=path,
+                text_length=len(text),
+                text=text
+            )
+
+        if 'cast' in movie:
+            for billing, person in enumerate(movie['cast'], 1):
+                self._append('cast', movie_id=movie_id, billing=billing, actor=person['name'],
+                             slug=person['slug'], character=person.get('character') or None)
+        else:
+            for billing, actor in enumerate(movie.get('actors', []), 1):
+                name, _, character = actor.partition(' as ')
+                self._append('cast', movie_id=movie_id, billing=billing, actor=name, slug=None, character=character or None)
+
+        for genre in movie.get('genres', []):
+            self._append('genres', movie_id=movie_id, genre=genre)
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+        return movie_id
+
+    def flush(self):
+        """Write the buffered rows of every table as one batch."""
+        for table, schema in self.schemas.items():
+            columns = self.columns[table]
+            if not columns[schema.names[0]]:
+                continue
+            batch = pa.record_batch([pa.array(columns[name], type=schema.field(name).type) for name in schema.names], schema=schema)
+            if self.fmt == FORMAT_PARQUET:
+                self.writers[table].write_table(pa.Table.from_batches([batch]))
+            else:
+                self.writers[table].write_batch(batch)
+            for values in columns.values():
+                values.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def convert_movies_file(movies_file, output_dir=OUTPUT_DIR, fmt=FORMAT_ARROW):
+    """
+    Batch-convert an existing letterboxd_movies.json to columnar files.
+
+    Returns:
+        int: Number of movies written
+    """
+    movies = load_movies(movies_file)
+    with ColumnarWriter(output_dir, fmt) as writer:
+        for movie in movies:
+            writer.add_movie(movie)
+    return len(movies)
+
+def read_columns(output_dir, table, columns, fmt=None):
+    """
+    Read only the given columns of a table, memory-mapping the file so the
+    columns that aren't asked for (like review text) are never loaded.
+
+    Args:
+        output_dir (str): Directory the export was written to
+        table (str): "movies", "reviews", "cast" or "genres"
+        columns (list): Column names to read
+        fmt (str): "arrow" or "parquet"; None reads whichever file exists
+
+    Returns:
+        pyarrow.Table: The requested columns
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to read the columnar export: pip install pyarrow")
+    if fmt not in (None, FORMAT_ARROW, FORMAT_PARQUET):
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    arrow_path = os.path.join(output_dir, f"{table}.{FORMAT_ARROW}")
+    if fmt == FORMAT_ARROW or (fmt is None and os.path.exists(arrow_path)):
+        source = pa.memory_map(arrow_path, 'r')
+        return pa.ipc.open_file(source).read_all().select(columns)
+
+    parquet_path = os.path.join(output_dir, f"{table}.{FORMAT_PARQUET}")
+    return pq.read_table(parquet_path, columns=columns, memory_map=True)
+
+def review_stats(output_dir=OUTPUT_DIR, fmt=None):
+    """
+    Summarise the review corpus from the columnar export without touching
+    the review text.
+
+    Args:
+        output_dir (str): Directory the export was written to
+        fmt (str): Format of the export, see read_columns
+
+    Returns:
+        dict: Review count, rating distribution, mean review length and the
+              number of reviews per movie_id
+    """
+    reviews = read_columns(output_dir, 'reviews', ['movie_id', 'rating', 'text_length'], fmt)
+
+    distribution = {
+        entry['values']: entry['counts']
+        for entry in pc.value_counts(reviews.column('rating').drop_null()).to_pylist()
+    }
+    per_movie = {
+        entry['values']: entry['counts']
+        for entry in pc.value_counts(reviews.column('movie_id')).to_pylist()
+    }
+
+    return {
+        "reviews": reviews.num_rows,
+        "rating_distribution": dict(sorted(distribution.items())),
+        "mean_text_length": pc.mean(reviews.column('text_length')).as_py(),
+        "reviews_per_movie": per_movie
+    }
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fmt = FORMAT_ARROW
+    if '--parquet' in args:
+        fmt = FORMAT_PARQUET
+        args.remove('--parquet')
+
+    movies_file = args[0] if len(args) > 0 else os.path.join('static', 'letterboxd_movies.json')
+    output_dir = args[1] if len(args) > 1 else OUTPUT_DIR
+
+    if not os.path.exists(movies_file):
+        print(f"Movies file not found: {movies_file}")
+        sys.exit(1)
+
+    print(f"Converting {movies_file} to {fmt} files in {output_dir}")
+    start_time = time.time()
+    count = convert_movies_file(movies_file, output_dir, fmt)
+    print(f"Wrote {count} movies in {time.time() - start_time:.1f} seconds")
+
+    start_time = time.time()
+    stats = review_stats(output_dir, fmt)
+    print(f"Read {stats['reviews']} reviews in {time.time() - start_time:.3f} seconds")
+    print(f"Rating distribution: {stats['rating_distribution']}")
+    if stats['mean_text_length'] is not None:
+        print(f"Mean review length: {stats['mean_text_length']:.0f} characters")
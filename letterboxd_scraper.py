@@ -7,9 +7,25 @@ import sys
 import os
 import random
 import re
-import langdetect
 from urllib.parse import urlparse
 
+from compact_records import Movie, dump_movies
+from profiling import stage
+
+def fetch_page(url, headers=None):
+    """
+    Fetch a page, timed as the "fetch" stage when profiling.
+    """
+    with stage('fetch'):
+        return requests.get(url, headers=headers)
+
+def parse_html(html):
+    """
+    Parse a page with BeautifulSoup, timed as the "parse_html" stage when profiling.
+    """
+    with stage('parse_html'):
+        return BeautifulSoup(html, 'html.parser')
+
 def is_english(text):
     """
     Determine if text is English using both character analysis and language detection.
@@ -30,6 +46,8 @@ def is_english(text):
             
         # For longer texts that pass the initial check, use language detection
         if len(text) > 50:
+            # Imported here since loading its language profiles is slow
+            import langdetect
             lang = langdetect.detect(text)
             return lang == 'en'
         return True
@@ -37,16 +55,28 @@ def is_english(text):
         print(f"  Language detection error: {str(e)}")
         return False  # If detection fails, skip to be safe
 
-def scrape_letterboxd_list(list_url, limit=None):
+def scrape_letterboxd_list(list_url, limit=None, on_movie=None):
+    """
+    Scrape every movie on a Letterboxd list.
+    
+    Args:
+        list_url (str): URL of the Letterboxd list
+        limit (int): Maximum number of movies to scrape (optional)
+        on_movie (callable): Called with each movie dictionary as soon as it's
+            scraped, e.g. to stream it into an export (optional)
+        
+    Returns:
+        list: Compact Movie records
+    """
     movies = []
     
     print(f"Fetching list page: {list_url}")
-    response = requests.get(list_url)
+    response = fetch_page(list_url)
     if response.status_code != 200:
         print(f"Failed to fetch list page: {response.status_code}")
         return movies
         
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = parse_html(response.text)
     
     # Check for pagination
     pagination = soup.select_one('.pagination')
@@ -66,11 +96,11 @@ def scrape_letterboxd_list(list_url, limit=None):
         
         print(f"Scraping page {page} of {pages}: {page_url}")
         if page > 1:
-            response = requests.get(page_url)
+            response = fetch_page(page_url)
             if response.status_code != 200:
                 print(f"Failed to fetch page {page}: {response.status_code}")
                 continue
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
         
         # Find all movie entries on current page
         film_posters = soup.select('.poster-container')
@@ -98,7 +128,11 @@ def scrape_letterboxd_list(list_url, limit=None):
                 
                 movie_data = scrape_movie_details(movie_url)
                 if movie_data:
-                    movies.append(movie_data)
+                    # Keep finished movies as compact records, a full list
+                    # scrape holds thousands of them until it's written out
+                    movies.append(Movie.from_dict(movie_data))
+                    if on_movie:
+                        on_movie(movie_data)
                     print(f"Successfully scraped data for: {movie_data['title']}")
                 
                 # Random delay between 2-4 seconds to avoid rate limiting
@@ -143,12 +177,12 @@ def download_movie_poster(movie_url, movie_title, year):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(movie_url, headers=headers)
+        response = fetch_page(movie_url, headers)
         if response.status_code != 200:
             print(f"  Failed to fetch movie page for poster: {response.status_code}")
             return None
             
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parse_html(response.text)
         
         # Method 1: Using JSON-LD structured data (most reliable)
         img_url = None
@@ -267,7 +301,9 @@ def process_review_items(review_items, unique_reviews, review_limit=100):
                 text = review_text.text.strip()
         
         # Skip non-English reviews
-        if not is_english(text):
+        with stage('langdetect'):
+            english = is_english(text)
+        if not english:
             continue
         
         # Skip empty reviews
@@ -327,6 +363,230 @@ def process_review_items(review_items, unique_reviews, review_limit=100):
             print(f"  Reached review limit of {review_limit}")
             break
 
+def harvest_reviews(movie_url, headers, soup=None, review_limit=100, min_reviews=50, max_pages_to_try=20):
+    """
+    Collect up to review_limit unique English reviews for a movie, walking the
+    different review sort orders until min_reviews have been found.
+    
+    Args:
+        movie_url (str): The URL of the movie page
+        headers (dict): Request headers to send with every page fetch
+        soup: Parsed movie page, whose own review list is used first (optional)
+        review_limit (int): Maximum number of reviews to collect
+        min_reviews (int): Stop trying further sort orders once we have this many
+        max_pages_to_try (int): Maximum pages to follow per sort order
+        
+    Returns:
+        list: Review dictionaries sorted by likes, most liked first
+    """
+    # Use a dictionary to track unique reviews by URL
+    unique_reviews = {}
+    
+    # Process reviews from the initial movie page if we already have it
+    if soup is not None:
+        review_items = soup.select('li.film-detail')
+        print(f"  Found {len(review_items)} reviews on movie page")
+        process_review_items(review_items, unique_reviews, review_limit)
+    
+    # If we need more reviews, try different sorting methods
+    sort_methods = [
+        ('activity', 'by/activity/'),  # Popular reviews
+        ('added', 'by/added/'),        # Recent reviews
+        ('rating-highest', 'by/rating-highest/'),  # Highest rated reviews
+        ('rating-lowest', 'by/rating-lowest/')     # Lowest rated reviews
+    ]
+    
+    # Try each sort method if we need more reviews
+    for sort_name, sort_path in sort_methods:
+        if len(unique_reviews) >= min_reviews:
+            print(f"  Already have {len(unique_reviews)} reviews, skipping {sort_name} sort")
+            continue
+            
+        reviews_url = f"{movie_url}/reviews/{sort_path}"
+        print(f"  Trying to get more reviews from {sort_name} sort: {reviews_url}")
+        
+        try:
+            # Process first page of reviews
+            response = fetch_page(reviews_url, headers)
+            if response.status_code == 200:
+                soup = parse_html(response.text)
+                page_reviews = soup.select('li.film-detail')
+                print(f"  Found {len(page_reviews)} reviews on {sort_name} reviews page")
+                
+                process_review_items(page_reviews, unique_reviews, review_limit)
+                
+                # Follow pagination with the Next link if needed
+                current_page = 1
+                max_pages = max_pages_to_try
+                
+                while len(unique_reviews) < review_limit and current_page < max_pages:
+                    # Look for the Next button
+                    next_link = soup.select_one('a.next')
+                    if not next_link:
+                        print(f"  No more Next links found for {sort_name} sort")
+                        break
+                        
+                    # Found a Next link, follow it
+                    next_url = "https://letterboxd.com" + next_link['href']
+                    current_page += 1
+                    print(f"  Following Next link to page {current_page} for {sort_name} sort: {next_url}")
+                    
+                    page_response = fetch_page(next_url, headers)
+                    if page_response.status_code != 200:
+                        print(f"  Failed to fetch reviews page {current_page}: {page_response.status_code}")
+                        break
+                        
+                    soup = parse_html(page_response.text)
+                    page_reviews = soup.select('li.film-detail')
+                    print(f"  Found {len(page_reviews)} reviews on {sort_name} sort page {current_page}")
+                    
+                    process_review_items(page_reviews, unique_reviews, review_limit)
+                    
+                    # Delay between pages
+                    delay = 2 + random.random() * 2
+                    print(f"  Waiting {delay:.1f} seconds before next page...")
+                    time.sleep(delay)
+                    
+                    if len(unique_reviews) >= review_limit:
+                        print(f"  Reached review limit of {review_limit} reviews on {sort_name} sort page {current_page}")
+                        break
+        except Exception as e:
+            print(f"  Error fetching paginated reviews for {sort_name} sort: {str(e)}")
+            time.sleep(3)  # Wait a bit before trying the next sort method
+    
+    # Convert dictionary to list and sort by likes
+    reviews_list = list(unique_reviews.values())
+    reviews_list.sort(key=lambda x: x.get("likes", 0), reverse=True)
+    
+    print(f"  Total unique reviews collected: {len(reviews_list)}")
+    
+    return reviews_list[:review_limit]
+
+def person_slug(href):
+    """
+    Split a Letterboxd person link such as "/actor/tom-hanks/" or
+    "/director/nora-ephron/" into its role and the person's slug. The slug is
+    the same whatever role the person is credited in.
+    
+    Returns:
+        tuple: (role, slug), or (None, None) for links that are not people
+    """
+    parts = [part for part in urlparse(href).path.split('/') if part]
+    if len(parts) != 2 or parts[0] in ('film', 'films'):
+        return None, None
+    return parts[0], parts[1]
+
+def parse_movie_page(soup):
+    """
+    Read the movie details from a parsed Letterboxd movie page.
+    
+    Args:
+        soup: BeautifulSoup of the movie page
+        
+    Returns:
+        dict: title, year, rating, genres, director, actors, cast, crew and is_liked
+    """
+    # Title
+    title_elem = soup.select_one('h1.headline-1')
+    if not title_elem:
+        title_elem = soup.select_one('h1.film-title')
+    title = title_elem.text.strip() if title_elem else "Unknown"
+    print(f"  Title: {title}")
+    
+    # Year
+    year_elem = soup.select_one('a[href^="/films/year/"]')
+    year = year_elem.text.strip() if year_elem else "Unknown"
+    print(f"  Year: {year}")
+    
+    # Rating
+    rating_elem = soup.select_one('meta[name="twitter:data2"]')
+    rating = rating_elem['content'].split(' ')[0] if rating_elem else "Not rated"
+    print(f"  Rating: {rating}")
+    
+    # Genres - specific to genre links
+    genres = []
+    genre_links = soup.select('a[href^="/films/genre/"]')
+    for link in genre_links:
+        genres.append(link.text.strip())
+    print(f"  Genres: {genres}")
+    
+    # Director - try multiple approaches
+    director = "Unknown"
+    # First try .contributor with director in href
+    director_elem = soup.select_one('a.contributor[href*="/director/"]')
+    if director_elem:
+        prettify_span = director_elem.select_one('.prettify')
+        if prettify_span:
+            director = prettify_span.text.strip()
+        else:
+            director = director_elem.text.strip()
+    else:
+        # Fallback to previous method
+        director_elem = soup.select_one('.film-header-lockup .directors a')
+        if director_elem:
+            director = director_elem.text.strip()
+    
+    print(f"  Director: {director}")
+    
+    # Top billed actors - get 5
+    actors = []
+    cast_container = soup.select_one('.cast-list')
+    if cast_container:
+        actor_links = cast_container.select('a.text-slug')
+        for i, actor in enumerate(actor_links):
+            if i < 5:  # Get top 5 actors
+                # Get character name from tooltip
+                character = actor.get('data-original-title', '').strip()
+                actor_name = actor.text.strip()
+                actor_info = actor_name
+                if character and character != "(uncredited)":
+                    actor_info += f" as {character}"
+                actors.append(actor_info)
+            else:
+                break
+    print(f"  Actors: {actors}")
+    
+    # Full cast and crew with their Letterboxd person slugs
+    cast = []
+    if cast_container:
+        for actor in cast_container.select('a.text-slug'):
+            _, slug = person_slug(actor.get('href', ''))
+            if not slug:
+                continue
+            character = actor.get('data-original-title', '').strip()
+            cast.append({
+                "name": actor.text.strip(),
+                "slug": slug,
+                "character": character if character != "(uncredited)" else ""
+            })
+    
+    crew = []
+    for person in soup.select('#tab-crew a.text-slug'):
+        role, slug = person_slug(person.get('href', ''))
+        if not slug:
+            continue
+        crew.append({"name": person.text.strip(), "slug": slug, "role": role})
+    print(f"  Cast and crew: {len(cast)} cast, {len(crew)} crew")
+    
+    # Check if the movie is liked by looking for the icon-liked class
+    is_liked = False
+    liked_icon = soup.select_one('.has-icon.icon-liked')
+    if liked_icon:
+        is_liked = True
+    print(f"  Movie Liked: {is_liked}")
+    
+    return {
+        "title": title,
+        "year": year,
+        "rating": rating,
+        "genres": genres,
+        "director": director,
+        "actors": actors,
+        "cast": cast,
+        "crew": crew,
+        "is_liked": is_liked
+    }
+
 def scrape_movie_details(movie_url):
     print(f"  Fetching movie page: {movie_url}")
     try:
@@ -334,215 +594,139 @@ def scrape_movie_details(movie_url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(movie_url, headers=headers)
+        response = fetch_page(movie_url, headers)
         if response.status_code != 200:
             print(f"  Failed to fetch movie page: {response.status_code}")
             return None
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Title
-        title_elem = soup.select_one('h1.headline-1')
-        if not title_elem:
-            title_elem = soup.select_one('h1.film-title')
-        title = title_elem.text.strip() if title_elem else "Unknown"
-        print(f"  Title: {title}")
-        
-        # Year
-        year_elem = soup.select_one('a[href^="/films/year/"]')
-        year = year_elem.text.strip() if year_elem else "Unknown"
-        print(f"  Year: {year}")
-        
-        # Rating
-        rating_elem = soup.select_one('meta[name="twitter:data2"]')
-        rating = rating_elem['content'].split(' ')[0] if rating_elem else "Not rated"
-        print(f"  Rating: {rating}")
-        
-        # Genres - specific to genre links
-        genres = []
-        genre_links = soup.select('a[href^="/films/genre/"]')
-        for link in genre_links:
-            genres.append(link.text.strip())
-        print(f"  Genres: {genres}")
-        
-        # Director - try multiple approaches
-        director = "Unknown"
-        # First try .contributor with director in href
-        director_elem = soup.select_one('a.contributor[href*="/director/"]')
-        if director_elem:
-            prettify_span = director_elem.select_one('.prettify')
-            if prettify_span:
-                director = prettify_span.text.strip()
-            else:
-                director = director_elem.text.strip()
-        else:
-            # Fallback to previous method
-            director_elem = soup.select_one('.film-header-lockup .directors a')
-            if director_elem:
-                director = director_elem.text.strip()
-        
-        print(f"  Director: {director}")
-        
-        # Top billed actors - get 5
-        actors = []
-        cast_container = soup.select_one('.cast-list')
-        if cast_container:
-            actor_links = cast_container.select('a.text-slug')
-            for i, actor in enumerate(actor_links):
-                if i < 5:  # Get top 5 actors
-                    # Get character name from tooltip
-                    character = actor.get('data-original-title', '').strip()
-                    actor_name = actor.text.strip()
-                    actor_info = actor_name
-                    if character and character != "(uncredited)":
-                        actor_info += f" as {character}"
-                    actors.append(actor_info)
-                else:
-                    break
-        print(f"  Actors: {actors}")
+        soup = parse_html(response.text)
         
-        # Check if the movie is liked by looking for the icon-liked class
-        is_liked = False
-        liked_icon = soup.select_one('.has-icon.icon-liked')
-        if liked_icon:
-            is_liked = True
-        print(f"  Movie Liked: {is_liked}")
+        with stage('details'):
+            details = parse_movie_page(soup)
+        title = details["title"]
+        year = details["year"]
         
         # Download movie poster
-        poster_path = download_movie_poster(movie_url, title, year)
-        
-        # Use a dictionary to track unique reviews by URL
-        unique_reviews = {}
-        review_limit = 100      # Increased from 40 to 100
-        min_reviews = 50        # Increased from 20 to 50
-        max_pages_to_try = 20   # Increased from 10 to 20
-        
-        # Process reviews from main movie page
-        review_items = soup.select('li.film-detail')
-        print(f"  Found {len(review_items)} reviews on movie page")
-        
-        # Process reviews from the initial movie page
-        process_review_items(review_items, unique_reviews, review_limit)
+        with stage('poster'):
+            poster_path = download_movie_poster(movie_url, title, year)
         
-        # If we need more reviews, try different sorting methods
-        sort_methods = [
-            ('activity', 'by/activity/'),  # Popular reviews
-            ('added', 'by/added/'),        # Recent reviews
-            ('rating-highest', 'by/rating-highest/'),  # Highest rated reviews
-            ('rating-lowest', 'by/rating-lowest/')     # Lowest rated reviews
-        ]
-        
-        # Try each sort method if we need more reviews
-        for sort_name, sort_path in sort_methods:
-            if len(unique_reviews) >= min_reviews:
-                print(f"  Already have {len(unique_reviews)} reviews, skipping {sort_name} sort")
-                continue
-                
-            reviews_url = f"{movie_url}/reviews/{sort_path}"
-            print(f"  Trying to get more reviews from {sort_name} sort: {reviews_url}")
-            
-            try:
-                # Process first page of reviews
-                response = requests.get(reviews_url, headers=headers)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    page_reviews = soup.select('li.film-detail')
-                    print(f"  Found {len(page_reviews)} reviews on {sort_name} reviews page")
-                    
-                    process_review_items(page_reviews, unique_reviews, review_limit)
-                    
-                    # Follow pagination with the Next link if needed
-                    current_page = 1
-                    max_pages = max_pages_to_try
-                    
-                    while len(unique_reviews) < review_limit and current_page < max_pages:
-                        # Look for the Next button
-                        next_link = soup.select_one('a.next')
-                        if not next_link:
-                            print(f"  No more Next links found for {sort_name} sort")
-                            break
-                            
-                        # Found a Next link, follow it
-                        next_url = "https://letterboxd.com" + next_link['href']
-                        current_page += 1
-                        print(f"  Following Next link to page {current_page} for {sort_name} sort: {next_url}")
-                        
-                        page_response = requests.get(next_url, headers=headers)
-                        if page_response.status_code != 200:
-                            print(f"  Failed to fetch reviews page {current_page}: {page_response.status_code}")
-                            break
-                            
-                        soup = BeautifulSoup(page_response.text, 'html.parser')
-                        page_reviews = soup.select('li.film-detail')
-                        print(f"  Found {len(page_reviews)} reviews on {sort_name} sort page {current_page}")
-                        
-                        process_review_items(page_reviews, unique_reviews, review_limit)
-                        
-                        # Delay between pages
-                        delay = 2 + random.random() * 2
-                        print(f"  Waiting {delay:.1f} seconds before next page...")
-                        time.sleep(delay)
-                        
-                        if len(unique_reviews) >= review_limit:
-                            print(f"  Reached review limit of {review_limit} reviews on {sort_name} sort page {current_page}")
-                            break
-            except Exception as e:
-                print(f"  Error fetching paginated reviews for {sort_name} sort: {str(e)}")
-                time.sleep(3)  # Wait a bit before trying the next sort method
-        
-        # Convert dictionary to list and sort by likes
-        reviews_list = list(unique_reviews.values())
-        reviews_list.sort(key=lambda x: x.get("likes", 0), reverse=True)
-        
-        print(f"  Total unique reviews collected: {len(reviews_list)}")
+        # Collect reviews, starting with the ones on the movie page itself
+        with stage('reviews'):
+            reviews_list = harvest_reviews(movie_url, headers, soup)
         
         return {
             "title": title,
             "year": year,
-            "rating": rating,
-            "genres": genres,
-            "director": director,
-            "actors": actors,
+            "rating": details["rating"],
+            "genres": details["genres"],
+            "director": details["director"],
+            "actors": details["actors"],
+            "cast": details["cast"],
+            "crew": details["crew"],
             "poster_path": poster_path,
-            "is_liked": is_liked,
-            "reviews": reviews_list[:review_limit]
+            "is_liked": details["is_liked"],
+            "url": movie_url,
+            "reviews": reviews_list
         }
     except Exception as e:
         print(f"Error processing movie: {str(e)}")
         return None
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python letterboxd_scraper.py <list_url> [limit]")
-        sys.exit(1)
-        
-    list_url = sys.argv[1]
-    limit = None  # Default to no limit
+def replay_pages(paths, repeat=1):
+    """
+    Run saved Letterboxd pages through the parsing stages without any network
+    requests, so parsing speed can be profiled and compared between versions.
     
-    if len(sys.argv) > 2:
-        try:
-            limit = int(sys.argv[2])
-            print(f"Will scrape up to {limit} movies")
-        except ValueError:
-            print(f"Invalid limit: {sys.argv[2]}. Will scrape all movies.")
+    Movie pages go through parse_movie_page and every page's reviews through
+    process_review_items.
+    
+    Args:
+        paths (list): Paths of saved .html pages
+        repeat (int): How many times to process each page
+        
+    Returns:
+        dict: Number of pages, movie pages and reviews processed
+    """
+    counts = {"pages": 0, "movies": 0, "reviews": 0}
+    for _ in range(repeat):
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                soup = parse_html(f.read())
+            counts["pages"] += 1
+            
+            if soup.select_one('h1.headline-1, h1.film-title'):
+                with stage('details'):
+                    parse_movie_page(soup)
+                counts["movies"] += 1
+            
+            unique_reviews = {}
+            with stage('reviews'):
+                process_review_items(soup.select('li.film-detail'), unique_reviews, review_limit=sys.maxsize)
+            counts["reviews"] += len(unique_reviews)
+    return counts
+
+def scrape_to_file(list_url, limit=None, output_file=None, columnar_dir=None):
+    """
+    Scrape a Letterboxd list and write the movies to letterboxd_movies.json.
     
+    Args:
+        list_url (str): URL of the Letterboxd list
+        limit (int): Maximum number of movies to scrape (optional)
+        output_file (str): Where to write the movies (defaults to static/letterboxd_movies.json)
+        columnar_dir (str): Also stream the movies into a columnar export here (optional)
+        
+    Returns:
+        int: Number of movies scraped
+    """
     # Create static directory if it doesn't exist
     static_dir = 'static'
     if not os.path.exists(static_dir):
         os.makedirs(static_dir)
+    output_file = output_file or os.path.join(static_dir, 'letterboxd_movies.json')
     
     print(f"Starting scrape of {list_url}")
     start_time = time.time()
     
-    movies = scrape_letterboxd_list(list_url, limit)
+    if columnar_dir:
+        # Stream each movie into the columnar export while scraping
+        from export_columnar import ColumnarWriter
+        with ColumnarWriter(columnar_dir) as writer:
+            movies = scrape_letterboxd_list(list_url, limit, on_movie=writer.add_movie)
+        print(f"Columnar export saved to {columnar_dir}")
+    else:
+        movies = scrape_letterboxd_list(list_url, limit)
     
     end_time = time.time()
     duration = end_time - start_time
     
-    output_file = os.path.join(static_dir, 'letterboxd_movies.json')
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(movies, f, ensure_ascii=False, indent=2)
+        dump_movies(movies, f)
     
     print(f"Scraped {len(movies)} movies in {duration:.1f} seconds")
     print(f"Data saved to {output_file}")
-    print(f"Movie posters saved to {os.path.join(static_dir, 'images')}")
\ No newline at end of file
+    print(f"Movie posters saved to {os.path.join(static_dir, 'images')}")
+    return len(movies)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    columnar_dir = None
+    if '--columnar' in args:
+        index = args.index('--columnar')
+        columnar_dir = args[index + 1]
+        del args[index:index + 2]
+    
+    if len(args) < 1:
+        print("Usage: python letterboxd_scraper.py <list_url> [limit] [--columnar output_dir]")
+        sys.exit(1)
+        
+    list_url = args[0]
+    limit = None  # Default to no limit
+    
+    if len(args) > 1:
+        try:
+            limit = int(args[1])
+            print(f"Will scrape up to {limit} movies")
+        except ValueError:
+            print(f"Invalid limit: {args[1]}. Will scrape all movies.")
+    
+    scrape_to_file(list_url, limit, columnar_dir=columnar_dir)
@@ -0,0 +1,293 @@
+# pipeline.py
+"""
+Single non-interactive entry point for the scraping pipeline.
+
+    python pipeline.py scrape <list_url> [--limit N] [--columnar DIR]
+    python pipeline.py backdrops <list_url> [--count N]
+    python pipeline.py manifest
+    python pipeline.py refresh [--force] [--limit N]
+    python pipeline.py schedule <list_url> [--budget N] [--schedule FILE]
+    python pipeline.py export [--parquet]
+    python pipeline.py publish [--per-shard N]
+    python pipeline.py search-index MOVIES_TABLE_EXPORT [SOURCE ...] [--query TEXT]
+    python pipeline.py graph-index [SOURCE ...] [--related KEY] [--check]
+    python pipeline.py check-assets [--repair] [--retry-no-backdrop]
+    python pipeline.py benchmark [MOVIES_FILE]
+    python pipeline.py replay PAGES_DIR [--repeat N]
+
+Add --profile to any command to run it under the stage profiler (see
+profiling.py). The folded stacks and report.json go to --profile-dir and the
+stage and hot-function tables are printed at the end of the run.
+
+Every option can also come from a JSON config file passed with --config,
+with one object of defaults per command:
+
+    {"scrape": {"list_url": "https://letterboxd.com/...", "limit": 200},
+     "refresh": {"limit": 50}}
+
+The scraper modules pull in requests, BeautifulSoup and langdetect, so they
+are only imported by the commands that need them.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+MOVIES_FILE = os.path.join('static', 'letterboxd_movies.json')
+
+def cmd_scrape(args):
+    if not args.list_url:
+        print("scrape needs a list URL, on the command line or in the config file")
+        return 2
+    from letterboxd_scraper import scrape_to_file
+    scrape_to_file(args.list_url, args.limit, args.output, args.columnar)
+    return 0
+
+def cmd_backdrops(args):
+    if not args.list_url:
+        print("backdrops needs a list URL, on the command line or in the config file")
+        return 2
+    from bg_scraper import scrape_backdrops
+    scrape_backdrops(args.list_url, args.count, args.output_dir)
+    return 0
+
+def cmd_manifest(args):
+    from backdrops import generate_manifest
+    count = generate_manifest(args.backdrop_dir, args.output)
+    print(f"Generated JSON with {count} backdrop images")
+    return 0
+
+def cmd_refresh(args):
+    if not os.path.exists(args.movies_file):
+        print(f"Movies file not found: {args.movies_file}")
+        return 1
+    from refresh_reviews import refresh_movies_file
+    stats = refresh_movies_file(args.movies_file, force=args.force, limit=args.limit)
+    return 1 if stats['failed'] and not stats['probed'] else 0
+
+def cmd_schedule(args):
+    if not args.list_url:
+        print("schedule needs a list URL, on the command line or in the config file")
+        return 2
+    from schedule_priority import run_schedule
+    run_schedule(args.list_url, args.budget, args.schedule, args.catalogue_size)
+    return 0
+
+def cmd_export(args):
+    if not os.path.exists(args.movies_file):
+        print(f"Movies file not found: {args.movies_file}")
+        return 1
+    from export_columnar import convert_movies_file, FORMAT_ARROW, FORMAT_PARQUET
+    fmt = FORMAT_PARQUET if args.parquet else FORMAT_ARROW
+    count = convert_movies_file(args.movies_file, args.output_dir, fmt)
+    print(f"Wrote {count} movies to {args.output_dir}")
+    return 0
+
+def cmd_publish(args):
+    from publish_bundles import publish
+    try:
+        index = publish(args.static_dir, args.output_dir or os.path.join(args.static_dir, 'bundles'), max(1, args.per_shard))
+    except ValueError as e:
+        print(str(e))
+        return 1
+    print(f"Published {len(index['movies'])} movies")
+    return 0
+
+def cmd_search_index(args):
+    sources = args.sources or [MOVIES_FILE]
+    for source in sources:
+        if not os.path.exists(source):
+            print(f"Movies file not found: {source}")
+            return 1
+    from build_search_index import build_index_file, search
+    try:
+        index = build_index_file(sources, args.output)
+    except ValueError as e:
+        print(str(e))
+        return 1
+    if args.query:
+        for match in search(index, args.query):
+            print(f"  {match['title']} ({match['year']}) - {match['director']}")
+    return 0
+
+def cmd_graph_index(args):
+    sources = args.sources or [MOVIES_FILE]
+    for source in sources:
+        if not os.path.exists(source):
+            print(f"Movies file not found: {source}")
+            return 1
+    from build_graph_index import build_graph_file, print_overlaps, FilmGraph
+    graph = FilmGraph(build_graph_file(sources, args.output))
+    if args.related:
+        for key, shared in graph.related_films(args.related):
+            print(f"  {key}: {shared} shared")
+    if args.check:
+        print_overlaps(graph, args.min_shared)
+    return 0
+
+def cmd_check_assets(args):
+    from check_assets import check_assets, repair
+    plan = check_assets(args.static_dir, max(1, args.workers), args.retry_no_backdrop)
+    if args.repair:
+        stats = repair(plan, args.static_dir, max(1, args.workers))
+        return 1 if stats['failed'] else 0
+    return 0
+
+def cmd_benchmark(args):
+    if not os.path.exists(args.movies_file):
+        print(f"Movies file not found: {args.movies_file}")
+        return 1
+    from compact_records import benchmark
+    result = benchmark(args.movies_file)
+    print(json.dumps(result, indent=2))
+    return 0 if result['round_trip'] else 1
+
+def cmd_replay(args):
+    if not os.path.isdir(args.pages_dir):
+        print(f"Pages directory not found: {args.pages_dir}")
+        return 1
+    paths = sorted(
+        os.path.join(args.pages_dir, name)
+        for name in os.listdir(args.pages_dir)
+        if name.lower().endswith(('.html', '.htm'))
+    )
+    if not paths:
+        print(f"No saved .html pages found in {args.pages_dir}")
+        return 1
+    from letterboxd_scraper import replay_pages
+    counts = replay_pages(paths, args.repeat)
+    print(f"Replayed {counts['pages']} pages: {counts['movies']} movie pages, {counts['reviews']} reviews")
+    return 0
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Config file {path} must contain a JSON object")
+    return config
+
+def build_parser():
+    """
+    Build the argument parser.
+
+    Returns:
+        tuple: (parser, {command name: subparser})
+    """
+    config_options = argparse.ArgumentParser(add_help=False)
+    config_options.add_argument('--config', help="JSON file with defaults for each command, keyed by command name")
+
+    common = argparse.ArgumentParser(add_help=False, parents=[config_options])
+    common.add_argument('--profile', action='store_true', help="run under the stage profiler")
+    common.add_argument('--profile-dir', help="where to write the profile (default profiles/<command>-<time>)")
+    common.add_argument('--profile-interval', type=float, default=0.005, help="seconds between samples")
+    common.add_argument('--profile-top', type=int, default=25, help="rows in the hot-function table")
+
+    parser = argparse.ArgumentParser(prog='pipeline.py', description="Letterboxd scraping pipeline", parents=[config_options])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    commands = {}
+
+    def add_command(name, handler, help_text):
+        command = subparsers.add_parser(name, help=help_text, parents=[common])
+        command.set_defaults(handler=handler)
+        commands[name] = command
+        return command
+
+    command = add_command('scrape', cmd_scrape, "scrape movies, reviews and posters from a list")
+    command.add_argument('list_url', nargs='?')
+    command.add_argument('--limit', type=int, help="maximum number of movies to scrape")
+    command.add_argument('--output', default=MOVIES_FILE)
+    command.add_argument('--columnar', metavar='DIR', help="also stream the movies into a columnar export")
+
+    command = add_command('backdrops', cmd_backdrops, "download backdrops for the first films of a list")
+    command.add_argument('list_url', nargs='?')
+    command.add_argument('--count', type=int, default=5)
+    command.add_argument('--output-dir', default=os.path.join('static', 'letterboxd_backdrops'))
+
+    command = add_command('manifest', cmd_manifest, "regenerate backdrop_images.json")
+    command.add_argument('--backdrop-dir', default=os.path.join('static', 'letterboxd_backdrops'))
+    command.add_argument('--output', default=os.path.join('static', 'backdrop_images.json'))
+
+    command = add_command('refresh', cmd_refresh, "re-harvest reviews of films that changed")
+    command.add_argument('--movies-file', default=MOVIES_FILE)
+    command.add_argument('--force', action='store_true', help="probe every film, even ones not due")
+    command.add_argument('--limit', type=int, help="maximum number of films to probe")
+
+    command = add_command('schedule', cmd_schedule, "scrape scheduled films first, then the catalogue")
+    command.add_argument('list_url', nargs='?')
+    command.add_argument('--budget', type=int, help="maximum number of tasks to run")
+    command.add_argument('--schedule', metavar='FILE', help="local schedule export instead of the database")
+    command.add_argument('--catalogue-size', type=int, default=500)
+
+    command = add_command('export', cmd_export, "convert movies to columnar Arrow/Parquet files")
+    command.add_argument('--movies-file', default=MOVIES_FILE)
+    command.add_argument('--output-dir', default=os.path.join('static', 'columnar'))
+    command.add_argument('--parquet', action='store_true')
+
+    command = add_command('publish', cmd_publish, "write precompressed per-movie data bundles")
+    command.add_argument('--static-dir', default='static')
+    command.add_argument('--output-dir')
+    command.add_argument('--per-shard', type=int, default=1)
+
+    command = add_command('search-index', cmd_search_index, "build the title autocomplete index")
+    command.add_argument('sources', nargs='*', metavar='SOURCE',
+                         help="movie JSON files, starting with an export of the movies table (id, title, year, director)")
+    command.add_argument('--output', default=os.path.join('static', 'search_index.json'))
+    command.add_argument('--query', help="print the matches for a query after building")
+
+    command = add_command('graph-index', cmd_graph_index, "build the cast, crew and genre index of related films")
+    command.add_argument('sources', nargs='*', metavar='SOURCE')
+    command.add_argument('--output', default=os.path.join('static', 'graph_index.json'))
+    command.add_argument('--related', metavar='KEY', help="print the films related to a movie key after building")
+    command.add_argument('--check', action='store_true', help="list pairs of films that are too easy to connect")
+    command.add_argument('--min-shared', type=int, default=3, help="shared people that make a pair obvious")
+
+    command = add_command('check-assets', cmd_check_assets, "verify posters and backdrops and plan repairs")
+    command.add_argument('--static-dir', default='static')
+    command.add_argument('--workers', type=int, default=16, help="verification threads")
+    command.add_argument('--repair', action='store_true', help="copy and re-fetch the missing and broken assets")
+    command.add_argument('--retry-no-backdrop', action='store_true', help="also look up backdrops for films that never had one")
+
+    command = add_command('benchmark', cmd_benchmark, "measure memory of compact movie records")
+    command.add_argument('movies_file', nargs='?', default=MOVIES_FILE)
+
+    command = add_command('replay', cmd_replay, "run saved Letterboxd pages through the parsers offline")
+    command.add_argument('pages_dir')
+    command.add_argument('--repeat', type=int, default=1)
+
+    return parser, commands
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser, commands = build_parser()
+
+    # Apply the config file as defaults so flags still override it
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--config')
+    known, _ = pre_parser.parse_known_args(argv)
+    if known.config:
+        try:
+            config = load_config(known.config)
+        except (OSError, ValueError) as e:
+            print(f"Could not read config file: {str(e)}")
+            return 2
+        for name, defaults in config.items():
+            if name in commands and isinstance(defaults, dict):
+                commands[name].set_defaults(**{key.replace('-', '_'): value for key, value in defaults.items()})
+
+    args = parser.parse_args(argv)
+    if not args.profile:
+        return args.handler(args)
+
+    from profiling import StageProfiler, format_report
+    profile_dir = args.profile_dir or os.path.join('profiles', f"{args.command}-{time.strftime('%Y%m%d-%H%M%S')}")
+    with StageProfiler(args.profile_interval) as profiler:
+        status = args.handler(args)
+    report = profiler.write_report(profile_dir, ' '.join(argv), args.profile_top)
+    print()
+    print(format_report(report, args.profile_top))
+    print(f"\nProfile saved to {profile_dir}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# profiling.py
+"""
+Sampling profiler scoped to pipeline stages.
+
+The scrapers mark their stages with `with stage('fetch'):` and friends. This
+costs next to nothing unless a StageProfiler is running (pipeline.py
+--profile). While one is running, a background thread samples the Python stack
+of every thread at a fixed interval. Each sample is tagged with the stage its
+thread was in, and the run is written as:
+
+    profile.folded           every sample, rooted at its stage path
+    profile-<stage>.folded   the samples of one top-level stage
+    report.json              stage wall times, sample counts and hot functions
+
+The .folded files are in the collapsed-stack format read by flamegraph.pl,
+speedscope and inferno.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds between samples
+DEFAULT_INTERVAL = 0.005
+
+# Rows in the hot-function table
+DEFAULT_TOP = 25
+
+# Stage for samples taken outside any stage
+UNSTAGED = 'unstaged'
+
+_active = None
+
+@contextmanager
+def stage(name):
+    """
+    Mark a pipeline stage. Stages nest, e.g. "reviews/fetch".
+    """
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+
+    profiler.enter(name)
+    try:
+        yield
+    finally:
+        profiler.leave()
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StageProfiler:
+    """
+    Collect stage-tagged stack samples for the duration of a run.
+
+    Usage:
+        with StageProfiler() as profiler:
+            run_the_pipeline()
+        profiler.write_report('profiles/run')
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = {}        # thread id -> list of active stage names
+        self.stage_times = {}   # stage path -> [calls, seconds]
+        self.samples = {}       # (stage path, frames) -> count
+        self.sample_seconds = {}  # (stage path, frames) -> seconds covered by those samples
+        self.sample_count = 0
+        self.started_at = None
+        self.duration = 0
+        self._entered = {}      # thread id -> list of entry times
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enter(self, name):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self.stacks.setdefault(thread_id, []).append(name)
+        self._entered.setdefault(thread_id, []).append(time.perf_counter())
+
+    def leave(self):
+        thread_id = threading.get_ident()
+        elapsed = time.perf_counter() - self._entered[thread_id].pop()
+        with self._lock:
+            stack = self.stacks[thread_id]
+            path = '/'.join(stack)
+            stack.pop()
+        totals = self.stage_times.setdefault(path, [0, 0.0])
+        totals[0] += 1
+        totals[1] += elapsed
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            # The sampler can wake late (the GIL is busy), so each sample
+            # stands for the time since the previous one, not the interval
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frames = sys._current_frames()
+            with self._lock:
+                stages = {thread_id: '/'.join(stack) for thread_id, stack in self.stacks.items() if stack}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.reverse()
+                key = (stages.get(thread_id, UNSTAGED), tuple(labels))
+                self.samples[key] = self.samples.get(key, 0) + 1
+                self.sample_seconds[key] = self.sample_seconds.get(key, 0.0) + elapsed
+                self.sample_count += 1
+
+    def start(self):
+        global _active
+        _active = self
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name='stage-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        global _active
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+        _active = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def folded_lines(self, top_stage=None):
+        """
+        Samples in collapsed-stack format, one "frame;frame;frame count" per line.
+
+        Args:
+            top_stage (str): Only include samples from this top-level stage
+        """
+        lines = []
+        for (stage_path, frames), count in sorted(self.samples.items()):
+            if top_stage is not None and stage_path.split('/')[0] != top_stage:
+                continue
+            stack = [f"[{name}]" for name in stage_path.split('/')] + list(frames)
+            lines.append(f"{';'.join(stack)} {count}")
+        return lines
+
+    def hot_functions(self, top=DEFAULT_TOP):
+        """
+        Functions ranked by samples spent in the function itself (self) and
+        anywhere below it (total). The seconds add up the measured time
+        between samples.
+
+        Returns:
+            list: [{"function", "self", "total", "self_seconds", "total_seconds", "stages"}, ...]
+        """
+        functions = {}
+        for key, count in self.samples.items():
+            stage_path, frames = key
+            if not frames:
+                continue
+            seconds = self.sample_seconds.get(key, 0.0)
+            for label in set(frames):
+                entry = functions.setdefault(label, {"function": label, "self": 0, "total": 0,
+                                                     "self_seconds": 0.0, "total_seconds": 0.0, "stages": {}})
+                entry["total"] += count
+                entry["total_seconds"] += seconds
+                entry["stages"][stage_path] = entry["stages"].get(stage_path, 0) + count
+            functions[frames[-1]]["self"] += count
+            functions[frames[-1]]["self_seconds"] += seconds
+
+        ranked = sorted(functions.values(), key=lambda entry: (-entry["self_seconds"], -entry["total_seconds"]))[:top]
+        for entry in ranked:
+            entry["self_seconds"] = round(entry["self_seconds"], 4)
+            entry["total_seconds"] = round(entry["total_seconds"], 4)
+        return ranked
+
+    def report(self, command=None, top=DEFAULT_TOP):
+        stage_samples = {}
+        for (stage_path, _), count in self.samples.items():
+            stage_samples[stage_path] = stage_samples.get(stage_path, 0) + count
+
+        stages = {}
+        for path in sorted(set(self.stage_times) | set(stage_samples)):
+            calls, seconds = self.stage_times.get(path, [0, 0.0])
+            stages[path] = {
+                "calls": calls,
+                "seconds": round(seconds, 4),
+                "samples": stage_samples.get(path, 0)
+            }
+
+        return {
+            "command": command,
+            "python": sys.version.split()[0],
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            "duration_seconds": round(self.duration, 4),
+            "interval_seconds": self.interval,
+            "samples": self.sample_count,
+            "stages": stages,
+            "hot_functions": self.hot_functions(top)
+        }
+
+    def write_report(self, output_dir, command=None, top=DEFAULT_TOP):
+        """
+        Write the folded stacks and report.json into output_dir.
+
+        Returns:
+            dict: The report
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        with open(os.path.join(output_dir, 'profile.folded'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded_lines()) + '\n')
+
+        top_stages = {stage_path.split('/')[0] for stage_path, _ in self.samples}
+        for top_stage in sorted(top_stages):
+            safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in top_stage)
+            with open(os.path.join(output_dir, f"profile-{safe_name}.folded"), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self.folded_lines(top_stage)) + '\n')
+
+        report = self.report(command, top)
+        with open(os.path.join(output_dir, 'report.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+def format_report(report, top=DEFAULT_TOP):
+    """
+    Render a report as the stage and hot-function tables printed after a run.
+    """
+    lines = [f"Profiled {report['command'] or 'run'}: {report['duration_seconds']:.2f}s, {report['samples']} samples"]
+
+    lines.append("")
+    lines.append(f"{'stage':<32} {'calls':>7} {'seconds':>9} {'samples':>8}")
+    for path, entry in report['stages'].items():
+        lines.append(f"{path:<32} {entry['calls']:>7} {entry['seconds']:>9.3f} {entry['samples']:>8}")
+
+    lines.append("")
+    lines.append(f"{'self s':>8} {'total s':>8}  function")
+    for entry in report['hot_functions'][:top]:
+        lines.append(f"{entry['self_seconds']:>8.3f} {entry['total_seconds']:>8.3f}  {entry['function']}")
+    return '\n'.join(lines)
@@ -0,0 +1,187 @@
+# publish_bundles.py
+import json
+import sys
+import os
+import gzip
+import hashlib
+import time
+import re
+
+from compact_records import movie_key
+
+# brotli is optional, without it only the gzip siblings are written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = 'static'
+OUTPUT_DIR = os.path.join(STATIC_DIR, 'bundles')
+INDEX_FILE = 'index.json'
+
+# Files written by write_bundle: <stem>.<10 hex digits>.json plus .gz/.br
+BUNDLE_PATTERN = re.compile(r'^.+\.[0-9a-f]{10}\.json(\.gz|\.br)?$')
+
+# Movies per shard; 1 means every movie gets its own bundle
+MOVIES_PER_SHARD = 1
+
+def minify(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_bundle(output_dir, name, data, written):
+    """
+    Write a minified bundle under a content-hashed filename together with its
+    precompressed .gz and .br siblings.
+
+    Args:
+        output_dir (str): Directory for the bundles
+        name (str): Filename stem, e.g. the movie key
+        data: JSON-serialisable bundle contents
+        written (set): Filenames produced by this run, updated in place
+
+    Returns:
+        str: The hashed filename, e.g. "Alien_1979.3f2a9c1e07.json"
+    """
+    payload = minify(data)
+    digest = hashlib.sha256(payload).hexdigest()[:10]
+    filename = f"{name}.{digest}.json"
+    write_compressed(output_dir, filename, payload, written)
+    return filename
+
+def write_compressed(output_dir, filename, payload, written, overwrite=False):
+    variants = {filename: payload}
+    # mtime=0 keeps the gzip output identical between runs
+    variants[filename + '.gz'] = gzip.compress(payload, compresslevel=9, mtime=0)
+    if brotli is not None:
+        variants[filename + '.br'] = brotli.compress(payload, quality=11)
+
+    for variant, content in variants.items():
+        written.add(variant)
+        path = os.path.join(output_dir, variant)
+        # Hashed names never change content, so existing files can be kept
+        if os.path.exists(path) and not overwrite:
+            continue
+        with open(path, 'wb') as f:
+            f.write(content)
+
+def group_clues(clues):
+    by_movie = {}
+    for clue in clues:
+        key = movie_key(clue.get('movieTitle', ''), clue.get('movieYear', ''))
+        by_movie.setdefault(key, []).append(clue)
+    return by_movie
+
+def publish(static_dir=STATIC_DIR, output_dir=OUTPUT_DIR, per_shard=MOVIES_PER_SHARD):
+    """
+    Build the sharded, precompressed data bundles for the game client.
+
+    Every shard is a list of entries holding the movie data, approved and
+    rejected clues and the backdrop of one movie, whatever per_shard is.
+    index.json maps each movie key to its shard and names the hashed backdrop
+    manifest bundle.
+
+    Only files named like bundles are removed from output_dir when a run no
+    longer writes them, and output_dir can't be static_dir itself.
+
+    Args:
+        static_dir (str): Directory holding the scraped JSON files
+        output_dir (str): Directory to write the bundles to
+        per_shard (int): Movies per shard
+
+    Returns:
+        dict: The index that was written
+
+    Raises:
+        ValueError: If output_dir is static_dir
+    """
+    if os.path.realpath(output_dir) == os.path.realpath(static_dir):
+        raise ValueError(f"Output directory {output_dir} is the static directory, use a subdirectory such as {OUTPUT_DIR}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    movies = load_json(os.path.join(static_dir, 'letterboxd_movies.json'), [])
+    approved = group_clues(load_json(os.path.join(static_dir, 'approved_clues.json'), []))
+    rejected = group_clues(load_json(os.path.join(static_dir, 'rejected_clues.json'), []))
+    backdrop_images = load_json(os.path.join(static_dir, 'backdrop_images.json'), [])
+    backdrop_summary = load_json(os.path.join(static_dir, 'letterboxd_backdrops', 'backdrop_summary.json'), [])
+
+    backdrops_by_title = {}
+    for entry in backdrop_summary:
+        if entry.get('saved_path'):
+            filename = entry['saved_path'].replace('\\', '/').split('/')[-1]
+            backdrops_by_title[entry.get('title')] = f"/letterboxd_backdrops/{filename}"
+
+    written = set()
+    index = {"movies": {}}
+
+    index["backdrops"] = write_bundle(output_dir, 'backdrops', {
+        "images": backdrop_images,
+        "summary": backdrop_summary
+    }, written)
+
+    shard = []
+    def flush_shard():
+        if not shard:
+            return
+        name = shard[0]['key'] if per_shard == 1 else f"shard-{len(index['movies']) // per_shard:04d}"
+        filename = write_bundle(output_dir, name, list(shard), written)
+        for entry in shard:
+            index["movies"][entry['key']] = {
+                "title": entry['movie'].get('title'),
+                "year": entry['movie'].get('year'),
+                "shard": filename
+            }
+        shard.clear()
+
+    for movie in movies:
+        key = movie_key(movie.get('title', ''), movie.get('year', ''))
+        shard.append({
+            "key": key,
+            "movie": movie,
+            "approved_clues": approved.get(key, []),
+            "rejected_clues": rejected.get(key, []),
+            "backdrop": backdrops_by_title.get(movie.get('title'))
+        })
+        if len(shard) >= per_shard:
+            flush_shard()
+    flush_shard()
+
+    write_compressed(output_dir, INDEX_FILE, minify(index), written, overwrite=True)
+
+    # Remove bundles left over from earlier runs
+    for filename in os.listdir(output_dir):
+        path = os.path.join(output_dir, filename)
+        if filename not in written and BUNDLE_PATTERN.match(filename) and os.path.isfile(path):
+            os.remove(path)
+
+    return index
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    per_shard = MOVIES_PER_SHARD
+    if '--per-shard' in args:
+        index = args.index('--per-shard')
+        per_shard = max(1, int(args[index + 1]))
+        del args[index:index + 2]
+
+    static_dir = args[0] if len(args) > 0 else STATIC_DIR
+    output_dir = args[1] if len(args) > 1 else os.path.join(static_dir, 'bundles')
+
+    if brotli is None:
+        print("brotli is not installed, only gzip siblings will be written (pip install brotli)")
+
+    start_time = time.time()
+    try:
+        index = publish(static_dir, output_dir, per_shard)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+    shards = {entry['shard'] for entry in index['movies'].values()}
+
+    print(f"Published {len(index['movies'])} movies in {len(shards)} shards in {time.time() - start_time:.1f} seconds")
+    print(f"Index saved to {os.path.join(output_dir, INDEX_FILE)}")
@@ -0,0 +1,254 @@
+# refresh_reviews.py
+import requests
+from bs4 import BeautifulSoup
+import json
+import time
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+from letterboxd_scraper import harvest_reviews
+from compact_records import get_movie_url
+
+# Per-film change-detection state, kept next to the scraped data
+STATE_FILE = os.path.join('static', 'refresh_state.json')
+
+# How many of the newest review URLs we fingerprint per film
+PROBE_SIZE = 12
+
+# Films that keep changing get checked more often, quiet ones less often
+DEFAULT_INTERVAL_DAYS = 4
+MIN_INTERVAL_DAYS = 1
+MAX_INTERVAL_DAYS = 32
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def probe_movie(movie_url):
+    """
+    Fetch the first page of the most recently added reviews for a movie.
+
+    This is the only request an unchanged film costs during a refresh.
+
+    Args:
+        movie_url (str): The URL of the movie page
+
+    Returns:
+        dict: {"newest": [review urls], "rating": average rating or None},
+              or None if the page could not be fetched
+    """
+    probe_url = f"{movie_url.rstrip('/')}/reviews/by/added/"
+    print(f"  Probing: {probe_url}")
+
+    try:
+        response = requests.get(probe_url, headers=HEADERS)
+        if response.status_code != 200:
+            print(f"  Failed to fetch reviews page: {response.status_code}")
+            return None
+    except Exception as e:
+        print(f"  Error probing movie: {str(e)}")
+        return None
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+
+    # Only the review links are needed here, so skip the full review parsing
+    newest = []
+    for link in soup.select('li.film-detail a.context'):
+        href = link.get('href')
+        if href:
+            newest.append("https://letterboxd.com" + href)
+        if len(newest) >= PROBE_SIZE:
+            break
+
+    rating_elem = soup.select_one('meta[name="twitter:data2"]')
+    rating = rating_elem['content'].split(' ')[0] if rating_elem else None
+
+    return {"newest": newest, "rating": rating}
+
+def has_changed(movie, entry, probe):
+    """
+    Compare a probe against what we stored for a movie.
+
+    Args:
+        movie (dict): Movie entry from letterboxd_movies.json
+        entry (dict): Stored refresh state for the movie, or None if never probed
+        probe (dict): Result of probe_movie
+
+    Returns:
+        bool: True if the movie has new reviews or a different average rating
+    """
+    if probe["rating"] and probe["rating"] != movie.get("rating"):
+        return True
+
+    # Without a baseline there is nothing to compare the newest reviews against
+    if not entry:
+        return False
+
+    known = set(entry.get("newest", []))
+    return any(url not in known for url in probe["newest"])
+
+def schedule_next_check(entry, changed, now):
+    """
+    Update the check interval of a movie and stamp its next check time.
+
+    Args:
+        entry (dict): Refresh state for the movie, updated in place
+        changed (bool): Whether the latest probe found a change
+        now (datetime): Time of the probe
+    """
+    interval = entry.get("interval_days", DEFAULT_INTERVAL_DAYS)
+    if changed:
+        interval = max(MIN_INTERVAL_DAYS, interval / 2)
+        entry["changes"] = entry.get("changes", 0) + 1
+    else:
+        interval = min(MAX_INTERVAL_DAYS, interval * 2)
+
+    entry["interval_days"] = interval
+    entry["checks"] = entry.get("checks", 0) + 1
+    entry["last_checked"] = now.isoformat(timespec='seconds')
+    entry["next_check"] = (now + timedelta(days=interval)).isoformat(timespec='seconds')
+
+def is_due(entry, now):
+    """
+    Check whether a movie is due for another probe.
+
+    Args:
+        entry (dict): Refresh state for the movie, or None if never probed
+        now (datetime): Current time
+
+    Returns:
+        bool: True if the movie should be probed now
+    """
+    if not entry or not entry.get("next_check"):
+        return True
+    return datetime.fromisoformat(entry["next_check"]) <= now
+
+def load_state(state_file=STATE_FILE):
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state, state_file=STATE_FILE):
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+def refresh_movies(movies, state, force=False, limit=None):
+    """
+    Probe every due movie and re-harvest the reviews of the ones that changed.
+
+    Args:
+        movies (list): Movie entries from letterboxd_movies.json, updated in place
+        state (dict): Refresh state keyed by movie URL, updated in place
+        force (bool): Probe every movie, even the ones that are not due yet
+        limit (int): Maximum number of movies to probe (optional)
+
+    Returns:
+        dict: Counts of probed, changed, skipped and failed movies
+    """
+    stats = {"probed": 0, "changed": 0, "skipped": 0, "failed": 0}
+    now = datetime.now()
+
+    # Probe the most overdue movies first so a limit doesn't starve them
+    due = []
+    for movie in movies:
+        movie_url = get_movie_url(movie)
+        if not movie_url:
+            print(f"Could not determine URL for {movie.get('title')}, skipping")
+            stats["failed"] += 1
+            continue
+        entry = state.get(movie_url)
+        if force or is_due(entry, now):
+            due.append((entry.get("next_check", "") if entry else "", movie_url, movie))
+        else:
+            stats["skipped"] += 1
+    due.sort(key=lambda item: item[0])
+
+    if limit:
+        stats["skipped"] += max(0, len(due) - limit)
+        due = due[:limit]
+
+    for i, (_, movie_url, movie) in enumerate(due, 1):
+        print(f"\n[{i}/{len(due)}] Checking: {movie.get('title')} ({movie.get('year')})")
+
+        probe = probe_movie(movie_url)
+        if probe is None:
+            stats["failed"] += 1
+            continue
+        stats["probed"] += 1
+
+        entry = state.get(movie_url)
+        changed = has_changed(movie, entry, probe)
+
+        if changed:
+            print("  Change detected, re-harvesting reviews")
+            movie["url"] = movie_url
+            if probe["rating"]:
+                movie["rating"] = probe["rating"]
+            reviews = harvest_reviews(movie_url, HEADERS)
+            if reviews:
+                movie["reviews"] = reviews
+            stats["changed"] += 1
+        else:
+            print("  No change")
+
+        entry = entry or {}
+        entry["newest"] = probe["newest"]
+        entry["rating"] = probe["rating"]
+        schedule_next_check(entry, changed, now)
+        state[movie_url] = entry
+
+        # Random delay between 1-2 seconds to avoid rate limiting
+        if i < len(due):
+            delay = 1 + random.random()
+            print(f"Waiting {delay:.1f} seconds before next request...")
+            time.sleep(delay)
+
+    return stats
+
+def refresh_movies_file(movies_file, force=False, limit=None, state_file=STATE_FILE):
+    """
+    Refresh the review pools of a movies file in place.
+
+    Args:
+        movies_file (str): Path to letterboxd_movies.json
+        force (bool): Probe every movie, even the ones that are not due yet
+        limit (int): Maximum number of movies to probe (optional)
+        state_file (str): Where the refresh state is kept
+
+    Returns:
+        dict: Counts of probed, changed, skipped and failed movies
+    """
+    with open(movies_file, 'r', encoding='utf-8') as f:
+        movies = json.load(f)
+    state = load_state(state_file)
+
+    print(f"Refreshing {len(movies)} movies from {movies_file}")
+    start_time = time.time()
+
+    stats = refresh_movies(movies, state, force=force, limit=limit)
+
+    with open(movies_file, 'w', encoding='utf-8') as f:
+        json.dump(movies, f, ensure_ascii=False, indent=2)
+    save_state(state, state_file)
+
+    duration = time.time() - start_time
+    print(f"\nProbed {stats['probed']} movies in {duration:.1f} seconds")
+    print(f"Changed: {stats['changed']}, not due: {stats['skipped']}, failed: {stats['failed']}")
+    print(f"Refresh state saved to {state_file}")
+    return stats
+
+if __name__ == "__main__":
+    movies_file = os.path.join('static', 'letterboxd_movies.json')
+    force = '--force' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    if args:
+        movies_file = args[0]
+
+    if not os.path.exists(movies_file):
+        print(f"Movies file not found: {movies_file}")
+        sys.exit(1)
+
+    refresh_movies_file(movies_file, force=force)
@@ -0,0 +1,372 @@
+# schedule_priority.py
+import requests
+import json
+import time
+import sys
+import os
+import random
+import re
+import heapq
+import unicodedata
+from datetime import date
+
+from letterboxd_scraper import scrape_movie_details
+from bg_scraper import get_movie_links_from_list, get_backdrop_image, save_backdrop_image
+from compact_records import get_movie_url
+
+MOVIES_FILE = os.path.join('static', 'letterboxd_movies.json')
+BACKDROP_DIR = os.path.join('static', 'letterboxd_backdrops')
+
+# How many upcoming schedule days to read from the database
+SCHEDULE_DAYS = 14
+
+# Catalogue work always sorts behind every scheduled film
+CATALOGUE_PRIORITY = 10000
+
+# Task kinds, in the order they are run for the same film
+TASK_DETAILS = 'details'    # movie page, reviews and poster
+TASK_BACKDROP = 'backdrop'
+TASK_ORDER = {TASK_DETAILS: 0, TASK_BACKDROP: 1}
+
+def letterboxd_slug(title):
+    """
+    Guess the Letterboxd film slug for a title ("Top Secret!" -> "top-secret").
+
+    Args:
+        title (str): Movie title
+
+    Returns:
+        str: Lowercase slug with accents and punctuation stripped
+    """
+    text = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    text = text.lower().replace("'", "")
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+def load_schedule_export(path):
+    """
+    Read upcoming schedule entries from a local export.
+
+    Accepts either a list of movie_schedule rows with the movie's title and
+    year, or a saved response of /api/movie-schedule.
+
+    Args:
+        path (str): Path to the JSON export
+
+    Returns:
+        list: [{"date": "YYYY-MM-DD", "title": str, "year": str}, ...]
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        rows = []
+        if data.get('todayMovie'):
+            rows.append(dict(data['todayMovie'], scheduledDate=date.today().isoformat()))
+        rows.extend(data.get('upcomingMovies', []))
+    else:
+        rows = data
+
+    schedule = []
+    for row in rows:
+        scheduled = row.get('date') or row.get('scheduledDate')
+        if not scheduled or not row.get('title'):
+            continue
+        schedule.append({
+            "date": scheduled[:10],
+            "title": row['title'],
+            "year": str(row.get('year') or '')
+        })
+    return schedule
+
+def load_schedule_from_db(days=SCHEDULE_DAYS):
+    """
+    Read upcoming schedule entries from Supabase using the app's credentials.
+
+    Args:
+        days (int): How many days ahead to read
+
+    Returns:
+        list: [{"date": "YYYY-MM-DD", "title": str, "year": str}, ...]
+    """
+    supabase_url = os.environ.get('SUPABASE_URL')
+    supabase_key = os.environ.get('SUPABASE_ANON_KEY')
+    if not supabase_url or not supabase_key:
+        print("SUPABASE_URL and SUPABASE_ANON_KEY must be set to read the schedule from the database")
+        return []
+
+    headers = {
+        'apikey': supabase_key,
+        'Authorization': f"Bearer {supabase_key}"
+    }
+    rest_url = supabase_url.rstrip('/') + '/rest/v1'
+    today = date.today().isoformat()
+
+    try:
+        response = requests.get(f"{rest_url}/movie_schedule", headers=headers, params={
+            'select': 'date,movie_id',
+            'date': f"gte.{today}",
+            'order': 'date.asc',
+            'limit': str(days)
+        })
+        if response.status_code != 200:
+            print(f"Failed to fetch movie schedule: {response.status_code}")
+            return []
+        rows = response.json()
+        if not rows:
+            return []
+
+        movie_ids = ','.join(str(row['movie_id']) for row in rows)
+        response = requests.get(f"{rest_url}/movies", headers=headers, params={
+            'select': 'id,title,year',
+            'id': f"in.({movie_ids})"
+        })
+        if response.status_code != 200:
+            print(f"Failed to fetch scheduled movies: {response.status_code}")
+            return []
+        movies_by_id = {movie['id']: movie for movie in response.json()}
+    except Exception as e:
+        print(f"Error reading schedule from database: {str(e)}")
+        return []
+
+    schedule = []
+    for row in rows:
+        movie = movies_by_id.get(row['movie_id'])
+        if movie:
+            schedule.append({
+                "date": row['date'][:10],
+                "title": movie['title'],
+                "year": str(movie.get('year') or '')
+            })
+    return schedule
+
+def resolve_schedule_urls(schedule, catalogue_links):
+    """
+    Find the Letterboxd URL of every scheduled film.
+
+    Films are matched against the catalogue list by slug first, falling back to
+    the slug Letterboxd would give the title so scheduled films that aren't in
+    the list can still be fetched.
+
+    Args:
+        schedule (list): Schedule entries from load_schedule_*
+        catalogue_links (list): Movie URLs from the catalogue list
+
+    Returns:
+        list: Schedule entries with a "movie_url" added
+    """
+    links_by_slug = {}
+    for link in catalogue_links:
+        match = re.search(r'/film/([^/]+)/?', link)
+        if match:
+            links_by_slug[match.group(1)] = link
+
+    resolved = []
+    for entry in schedule:
+        slug = letterboxd_slug(entry['title'])
+        movie_url = links_by_slug.get(f"{slug}-{entry['year']}") or links_by_slug.get(slug)
+        if not movie_url:
+            movie_url = f"https://letterboxd.com/film/{slug}/"
+        resolved.append(dict(entry, movie_url=movie_url))
+    return resolved
+
+def backdrop_exists(title, backdrop_dir=BACKDROP_DIR):
+    safe_title = re.sub(r'[^\w\-]', '_', title)
+    return os.path.exists(os.path.join(backdrop_dir, f"{safe_title}_backdrop.jpg"))
+
+def build_work_queue(schedule, catalogue_links, movies, today=None):
+    """
+    Build a priority queue of scraping tasks, most urgent first.
+
+    Scheduled films are keyed by how many days until they're needed; catalogue
+    films follow in list order. Work that's already on disk is left out.
+
+    Args:
+        schedule (list): Schedule entries with "movie_url" (see resolve_schedule_urls)
+        catalogue_links (list): Movie URLs from the catalogue list, in list order
+        movies (list): Movies already scraped into letterboxd_movies.json
+        today (date): Reference date for due dates (defaults to today)
+
+    Returns:
+        list: heapq of (priority, kind order, seq, kind, movie_url, title) tuples
+    """
+    today = today or date.today()
+
+    scraped = {}
+    for movie in movies:
+        movie_url = get_movie_url(movie)
+        if movie_url:
+            scraped[movie_url.rstrip('/')] = movie
+
+    queue = []
+    queued = set()
+    seq = 0
+
+    def push(priority, movie_url, title):
+        nonlocal seq
+        key = movie_url.rstrip('/')
+        if key in queued:
+            return
+        queued.add(key)
+
+        movie = scraped.get(key)
+        if not movie or not movie.get('reviews'):
+            heapq.heappush(queue, (priority, TASK_ORDER[TASK_DETAILS], seq, TASK_DETAILS, movie_url, title))
+            seq += 1
+        # Backdrops are named after the title from the movie page, so films we
+        # haven't scraped yet always get a backdrop task
+        if not movie or not backdrop_exists(movie['title']):
+            heapq.heappush(queue, (priority, TASK_ORDER[TASK_BACKDROP], seq, TASK_BACKDROP, movie_url, title))
+            seq += 1
+
+    for entry in schedule:
+        days_until = (date.fromisoformat(entry['date']) - today).days
+        if days_until < 0:
+            continue
+        push(min(days_until, CATALOGUE_PRIORITY - 1), entry['movie_url'], entry['title'])
+
+    for position, movie_url in enumerate(catalogue_links):
+        push(CATALOGUE_PRIORITY + position, movie_url, None)
+
+    return queue
+
+def merge_movie(movies, movie_data):
+    """
+    Add a freshly scraped movie, replacing an older entry for the same film.
+    """
+    movie_url = movie_data['url'].rstrip('/')
+    for i, movie in enumerate(movies):
+        existing_url = get_movie_url(movie)
+        if existing_url and existing_url.rstrip('/') == movie_url:
+            movies[i] = movie_data
+            return
+    movies.append(movie_data)
+
+def run_work_queue(queue, movies, budget=None):
+    """
+    Run tasks from the queue in priority order until it's empty or the budget
+    is spent.
+
+    Args:
+        queue (list): heapq built by build_work_queue
+        movies (list): Scraped movies, updated in place
+        budget (int): Maximum number of tasks to run (optional)
+
+    Returns:
+        list: Backdrop summary entries for the backdrops that were fetched
+    """
+    os.makedirs(BACKDROP_DIR, exist_ok=True)
+    backdrop_results = []
+    done = 0
+
+    while queue and (budget is None or done < budget):
+        priority, _, _, kind, movie_url, title = heapq.heappop(queue)
+        due = f"due in {priority} days" if priority < CATALOGUE_PRIORITY else "catalogue"
+        print(f"\n[{done + 1}] {kind} ({due}): {title or movie_url}")
+
+        try:
+            if kind == TASK_DETAILS:
+                movie_data = scrape_movie_details(movie_url)
+                if movie_data:
+                    merge_movie(movies, movie_data)
+            else:
+                found_title, backdrop_url = get_backdrop_image(movie_url)
+                saved_path = save_backdrop_image(backdrop_url, found_title, BACKDROP_DIR) if backdrop_url else None
+                backdrop_results.append({
+                    "title": found_title,
+                    "movie_url": movie_url,
+                    "backdrop_url": backdrop_url,
+                    "saved_path": saved_path
+                })
+        except Exception as e:
+            print(f"Error running {kind} task: {str(e)}")
+            time.sleep(5)  # Longer delay after an error
+
+        done += 1
+
+        # Random delay between 2-4 seconds to avoid rate limiting
+        if queue and (budget is None or done < budget):
+            delay = 2 + random.random() * 2
+            print(f"Waiting {delay:.1f} seconds before next request...")
+            time.sleep(delay)
+
+    if queue:
+        print(f"\nBudget spent, {len(queue)} tasks left for the next run")
+    return backdrop_results
+
+def save_backdrop_summary(results):
+    summary_file = os.path.join(BACKDROP_DIR, 'backdrop_summary.json')
+    summary = []
+    if os.path.exists(summary_file):
+        with open(summary_file, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+
+    fetched = {result['movie_url'] for result in results}
+    summary = [entry for entry in summary if entry.get('movie_url') not in fetched] + results
+
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+def run_schedule(list_url, budget=None, schedule_file=None, catalogue_size=500):
+    """
+    Fetch scheduled films first, then fill the rest of the budget from the
+    catalogue list.
+
+    Args:
+        list_url (str): URL of the catalogue Letterboxd list
+        budget (int): Maximum number of tasks to run (optional)
+        schedule_file (str): Local schedule export; read from the database if not given
+        catalogue_size (int): How many films of the list to consider
+
+    Returns:
+        int: Number of tasks left in the queue
+    """
+    if schedule_file:
+        schedule = load_schedule_export(schedule_file)
+    else:
+        schedule = load_schedule_from_db()
+    print(f"Loaded {len(schedule)} scheduled films")
+
+    movies = []
+    if os.path.exists(MOVIES_FILE):
+        with open(MOVIES_FILE, 'r', encoding='utf-8') as f:
+            movies = json.load(f)
+
+    catalogue_links = get_movie_links_from_list(list_url, catalogue_size)
+    schedule = resolve_schedule_urls(schedule, catalogue_links)
+    queue = build_work_queue(schedule, catalogue_links, movies)
+    print(f"Queued {len(queue)} tasks")
+
+    start_time = time.time()
+    backdrop_results = run_work_queue(queue, movies, budget)
+
+    with open(MOVIES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(movies, f, ensure_ascii=False, indent=2)
+    if backdrop_results:
+        save_backdrop_summary(backdrop_results)
+
+    duration = time.time() - start_time
+    print(f"Finished in {duration:.1f} seconds")
+    print(f"Data saved to {MOVIES_FILE}")
+    return len(queue)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python schedule_priority.py <list_url> [budget] [--schedule schedule.json] [--catalogue-size N]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    schedule_file = None
+    catalogue_size = 500
+    if '--schedule' in args:
+        index = args.index('--schedule')
+        schedule_file = args[index + 1]
+        del args[index:index + 2]
+    if '--catalogue-size' in args:
+        index = args.index('--catalogue-size')
+        catalogue_size = int(args[index + 1])
+        del args[index:index + 2]
+
+    list_url = args[0]
+    budget = int(args[1]) if len(args) > 1 else None
+
+    run_schedule(list_url, budget, schedule_file, catalogue_size)
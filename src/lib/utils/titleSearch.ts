@@ -0,0 +1,131 @@
+// lib/utils/titleSearch.ts
+// Autocomplete over the prebuilt static/search_index.json (see build_search_index.py)
+
+// [key, title, year, director, normalized alternates]
+type IndexEntry = [string, string, string, string, string[]];
+
+export interface SearchIndex {
+  version: number;
+  entries: IndexEntry[];
+  prefixes: Record<string, number[]>;
+  bigrams: Record<string, number[]>;
+}
+
+export interface TitleSuggestion {
+  id: string;
+  title: string;
+  year: string;
+  director: string;
+}
+
+// Must match PREFIX_LENGTH, FUZZY_THRESHOLD and the index version in build_search_index.py
+export const INDEX_VERSION = 2;
+const PREFIX_LENGTH = 3;
+const FUZZY_THRESHOLD = 0.5;
+
+// Same normalization as build_search_index.normalize
+export function normalizeTitle(text: string): string {
+  return String(text)
+    .normalize('NFKD')
+    .replace(/\p{M}/gu, '')
+    .toLowerCase()
+    .replace(/&/g, ' and ')
+    .replace(/['’]/g, '')
+    .replace(/[^a-z0-9]+/g, ' ')
+    .trim();
+}
+
+function bigrams(text: string): Set<string> {
+  const padded = ` ${text} `;
+  const grams = new Set<string>();
+  for (let i = 0; i < padded.length - 1; i++) {
+    grams.add(padded.slice(i, i + 2));
+  }
+  return grams;
+}
+
+// Same as build_search_index.fuzzy_alternates: the spaceless alternate is left out
+function fuzzyAlternates(alternates: string[]): string[] {
+  const spaceless = alternates[0].replace(/ /g, '');
+  return alternates.filter(alternate => alternate === alternates[0] || alternate !== spaceless);
+}
+
+function dice(a: Set<string>, b: Set<string>): number {
+  if (!a.size && !b.size) return 0;
+  let shared = 0;
+  for (const gram of a) {
+    if (b.has(gram)) shared++;
+  }
+  return (2 * shared) / (a.size + b.size);
+}
+
+function matchesAllTokens(text: string, tokens: string[]): boolean {
+  const words = text.split(' ');
+  return tokens.every(token => words.some(word => word.startsWith(token)));
+}
+
+// Code point order like Python's sorted(), so ties rank the same in both
+function compareTitles(a: string, b: string): number {
+  const left = a.toLowerCase();
+  const right = b.toLowerCase();
+  return left < right ? -1 : left > right ? 1 : 0;
+}
+
+export function searchTitles(index: SearchIndex, query: string, limit = 12): TitleSuggestion[] {
+  const q = normalizeTitle(query);
+  if (!q) return [];
+
+  const tokens = q.split(' ');
+  const spaceless = q.replace(/ /g, '');
+  const scores = new Map<number, number>();
+
+  // Every query token must be the start of a word in the title or director
+  let candidates: Set<number> | null = null;
+  for (const token of tokens) {
+    const ids = new Set(index.prefixes[token.slice(0, PREFIX_LENGTH)] ?? []);
+    candidates = candidates === null ? ids : new Set([...candidates].filter(id => ids.has(id)));
+  }
+
+  for (const entryId of candidates ?? []) {
+    const [, , , director, alternates] = index.entries[entryId];
+    for (const alternate of alternates) {
+      if (!matchesAllTokens(alternate, tokens)) continue;
+      let score = 2;
+      if (alternate.startsWith(q)) score += 1;
+      if (alternate === q || alternate.replace(/ /g, '') === spaceless) score += 2;
+      scores.set(entryId, Math.max(scores.get(entryId) ?? 0, score));
+    }
+    if (!scores.has(entryId) && matchesAllTokens(normalizeTitle(director), tokens)) {
+      scores.set(entryId, 1);
+    }
+  }
+
+  // Misspellings: titles whose bigrams are similar enough to the query's
+  if (q.length >= 3) {
+    const queryGrams = bigrams(q);
+    const minShared = (FUZZY_THRESHOLD * queryGrams.size) / (2 - FUZZY_THRESHOLD);
+    const counts = new Map<number, number>();
+    for (const gram of queryGrams) {
+      for (const entryId of index.bigrams[gram] ?? []) {
+        counts.set(entryId, (counts.get(entryId) ?? 0) + 1);
+      }
+    }
+    for (const [entryId, count] of counts) {
+      if (count < minShared) continue;
+      for (const alternate of fuzzyAlternates(index.entries[entryId][4])) {
+        const similarity = alternate.replace(/ /g, '') === spaceless ? 5 : dice(queryGrams, bigrams(alternate));
+        if (similarity >= FUZZY_THRESHOLD) {
+          scores.set(entryId, Math.max(scores.get(entryId) ?? 0, similarity));
+        }
+      }
+    }
+  }
+
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1] || compareTitles(index.entries[a[0]][1], index.entries[b[0]][1]))
+    .slice(0, limit)
+    .map(([entryId]) => {
+      const [key, title, year, director] = index.entries[entryId];
+      return { id: key, title, year, director };
+    });
+}
@@ -2,8 +2,37 @@
 import { json } from '@sveltejs/kit';
 import type { RequestEvent } from '@sveltejs/kit';
 import { supabase } from '$lib/supabaseClient';
+import { searchTitles, INDEX_VERSION, type SearchIndex } from '$lib/utils/titleSearch';
 
-export const GET = async ({ url }: RequestEvent) => {
+// The prebuilt title index (static/search_index.json), loaded once per server instance
+let searchIndexPromise: Promise<SearchIndex | null> | null = null;
+
+function loadSearchIndex(fetch: RequestEvent['fetch']): Promise<SearchIndex | null> {
+  if (!searchIndexPromise) {
+    searchIndexPromise = fetch('/search_index.json')
+      .then(response => (response.ok ? response.json() : null))
+      .then(index => {
+        // An index from an older build_search_index.py has a different layout
+        if (index && index.version !== INDEX_VERSION) {
+          console.error(`Search index version ${index.version} does not match ${INDEX_VERSION}, rebuild it`);
+          return null;
+        }
+        return index;
+      })
+      .catch(error => {
+        console.error('Error loading search index:', error);
+        return null;
+      })
+      .then(index => {
+        // Try again on the next request if the index isn't there yet
+        if (!index) searchIndexPromise = null;
+        return index;
+      });
+  }
+  return searchIndexPromise;
+}
+
+export const GET = async ({ url, fetch }: RequestEvent) => {
   try {
     // Add cache control headers
     const headers = {
@@ -18,6 +47,19 @@ export const GET = async ({ url }: RequestEvent) => {
       return json([], { headers });
     }
     
+    // Answer from the in-memory index when it has been published
+    const searchIndex = await loadSearchIndex(fetch);
+    if (searchIndex && searchIndex.entries.length > 0) {
+      const matches = searchTitles(searchIndex, query);
+      if (matches.length > 0) {
+        return json(matches, {
+          headers: { 'Cache-Control': 'public, max-age=300' }
+        });
+      }
+    }
+    
+    // Fall back to searching the database, which also covers movies added
+    // since the index was built
     // Fetch movies that match the query
     const { data: movies, error } = await supabase
       .from('movies')
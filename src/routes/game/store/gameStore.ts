@@ -767,7 +767,7 @@ export function handleGuessInput(value: string): void {
   const query = value.toLowerCase();
   
   // Fetch movie suggestions from API if needed
-  fetch(`/api/movie-suggestions?query=${query}`)
+  fetch(`/api/movie-suggestions?query=${encodeURIComponent(query)}`)
     .then(response => response.json())
     .then(data => {
       filteredMovies.set(data);